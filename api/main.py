@@ -5,7 +5,9 @@ from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 
 from app.config import settings
 from api.routes import router
@@ -18,8 +20,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Scheduler for periodic predictions
-scheduler = AsyncIOScheduler()
+# Scheduler for periodic predictions - training gets its own thread so a long
+# run never holds up inference; missed ticks are coalesced instead of piling up.
+# Training stays in-process: it clears the prediction store, whose cached
+# feature group handle and in-memory history live in this process
+scheduler = AsyncIOScheduler(
+    executors={
+        "default": ThreadPoolExecutor(max_workers=2),
+        "training": ThreadPoolExecutor(max_workers=1)
+    },
+    job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": 60
+    }
+)
+
+# Held open for the life of the process by the worker that owns the scheduler
+_scheduler_lock_file = None
+
+
+def _acquire_scheduler_lock() -> bool:
+    """Elect a single worker process to run the scheduled jobs"""
+    global _scheduler_lock_file
+    try:
+        import fcntl
+    except ImportError:
+        # Non-POSIX platform - only single-worker runs are supported there
+        return True
+    
+    lock_path = settings.BASE_DIR / "data" / ".scheduler.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = open(lock_path, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    
+    _scheduler_lock_file = lock_file
+    return True
 
 
 def run_scheduled_prediction():
@@ -40,6 +80,24 @@ def run_scheduled_training():
         logger.info(f"Training complete: Best model = {result.get('best_model', 'N/A')}")
     except Exception as e:
         logger.error(f"Scheduled training error: {e}")
+        return
+    
+    # Still on the training thread - pick up the promoted models and the
+    # prediction history training just cleared without touching the event loop
+    _reload_after_training()
+
+
+def _reload_after_training():
+    """Reload models and prediction history once a training run finished"""
+    try:
+        from app.predictor import model_loader, _load_predictions_from_file
+        from app.explainer import clear_explainer_cache
+        if model_loader.load():
+            clear_explainer_cache()
+            logger.info("Reloaded models after scheduled training")
+        _load_predictions_from_file()
+    except Exception as e:
+        logger.error(f"Post-training reload error: {e}")
 
 
 @asynccontextmanager
@@ -48,6 +106,11 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("CryptoSentinel API starting up")
     
+    # Sync routes run on AnyIO worker threads (40 by default); widen the pool
+    # so slow outbound CoinGecko calls don't queue up other requests
+    from anyio import to_thread
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREAD_LIMIT
+    
     # Load models
     from app.predictor import model_loader
     loaded = model_loader.load()
@@ -56,34 +119,39 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("No models loaded - run training pipeline first")
     
-    # Start schedulers
-    # Inference pipeline - every 5 minutes
-    scheduler.add_job(
-        run_scheduled_prediction,
-        "interval",
-        minutes=settings.PREDICTION_REFRESH_MINUTES,
-        id="prediction_job",
-        next_run_time=datetime.now()
-    )
-    
-    # Training pipeline - every 30 minutes
-    scheduler.add_job(
-        run_scheduled_training,
-        "interval",
-        minutes=settings.TRAINING_INTERVAL_MINUTES,
-        id="training_job",
-        next_run_time=datetime.now()
-    )
-    
-    scheduler.start()
-    logger.info(f"Scheduler started:")
-    logger.info(f"  - Inference pipeline: every {settings.PREDICTION_REFRESH_MINUTES} min")
-    logger.info(f"  - Training pipeline: every {settings.TRAINING_INTERVAL_MINUTES} min")
+    # Start schedulers (one worker only when running with several)
+    if _acquire_scheduler_lock():
+        # Inference pipeline - every 5 minutes
+        scheduler.add_job(
+            run_scheduled_prediction,
+            "interval",
+            minutes=settings.PREDICTION_REFRESH_MINUTES,
+            id="prediction_job",
+            next_run_time=datetime.now()
+        )
+        
+        # Training pipeline - every 30 minutes
+        scheduler.add_job(
+            run_scheduled_training,
+            "interval",
+            minutes=settings.TRAINING_INTERVAL_MINUTES,
+            id="training_job",
+            executor="training",
+            next_run_time=datetime.now()
+        )
+        
+        scheduler.start()
+        logger.info(f"Scheduler started:")
+        logger.info(f"  - Inference pipeline: every {settings.PREDICTION_REFRESH_MINUTES} min")
+        logger.info(f"  - Training pipeline: every {settings.TRAINING_INTERVAL_MINUTES} min")
+    else:
+        logger.info("Scheduler owned by another worker - serving requests only")
     
     yield
     
     # Shutdown
-    scheduler.shutdown()
+    if scheduler.running:
+        scheduler.shutdown()
     logger.info("CryptoSentinel API shutting down")
 
 
@@ -91,6 +159,7 @@ app = FastAPI(
     title="CryptoSentinel API",
     description="Bitcoin Price Prediction with ML",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -134,10 +203,20 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "api.main:app",
-        host=settings.API_HOST,
-        port=settings.API_PORT,
-        reload=settings.DEBUG
-    )
+    if settings.DEBUG:
+        uvicorn.run(
+            "api.main:app",
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            reload=True
+        )
+    else:
+        uvicorn.run(
+            "api.main:app",
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            loop="uvloop",
+            http="httptools",
+            workers=settings.API_WORKERS
+        )
 
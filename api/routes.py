@@ -1,15 +1,20 @@
 """API Routes - All endpoints"""
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
-from app.data_fetcher import fetch_current_price, fetch_price_history, fetch_market_data
-from app.feature_engineering import engineer_features
+from app.data_fetcher import (
+    fetch_current_price, fetch_price_history, fetch_price_history_df, fetch_market_data
+)
+from app.feature_engineering import engineer_features_cached
 from app.predictor import (
-    generate_prediction, get_prediction_history, 
-    get_prediction_accuracy, validate_predictions
+    get_prediction_history, get_prediction_accuracy,
+    validate_predictions, prediction_batcher
 )
 from app.explainer import get_shap_values, get_feature_importance, get_model_explanation_summary
 from app.drift_detection import get_drift_reports, get_drift_summary
@@ -20,12 +25,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+class NumpyORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also serialises NumPy scalars and arrays"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
 # Price endpoints
 @router.get("/price/current")
 def get_current_price():
     """Get current Bitcoin price"""
     try:
-        return fetch_current_price()
+        return NumpyORJSONResponse(fetch_current_price())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -34,7 +46,7 @@ def get_current_price():
 def get_price_history(hours: int = Query(24, ge=1, le=168)):
     """Get price history"""
     try:
-        return fetch_price_history(hours)
+        return NumpyORJSONResponse(fetch_price_history(hours))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -50,18 +62,21 @@ def get_market():
 
 # Prediction endpoints
 @router.get("/prediction/current")
-def get_current_prediction():
+async def get_current_prediction():
     """Get current prediction"""
     try:
-        current = fetch_current_price()
-        history = fetch_price_history(hours=6)
-        features = engineer_features(history)
-        prediction = generate_prediction(features, current["current_price"])
+        # Independent fetches - run them concurrently off the event loop
+        current, history = await asyncio.gather(
+            asyncio.to_thread(fetch_current_price),
+            asyncio.to_thread(fetch_price_history_df, 6)
+        )
+        features = await asyncio.to_thread(engineer_features_cached, history)
+        prediction = await prediction_batcher.predict(features, current["current_price"])
         
         if prediction is None:
             raise HTTPException(status_code=503, detail="Models not loaded")
         
-        return prediction
+        return NumpyORJSONResponse(prediction)
     except HTTPException:
         raise
     except Exception as e:
@@ -71,8 +86,7 @@ def get_current_prediction():
 @router.get("/prediction/history")
 def get_predictions_history(limit: int = Query(20, ge=1, le=100)):
     """Get prediction history"""
-    history = get_prediction_history()
-    return history[-limit:]
+    return NumpyORJSONResponse(get_prediction_history(limit))
 
 
 @router.get("/prediction/accuracy")
@@ -113,9 +127,9 @@ def get_model_metrics():
 def get_explainability():
     """Get model explainability data"""
     try:
-        history = fetch_price_history(hours=6)
-        features = engineer_features(history)
-        return get_model_explanation_summary(features)
+        history = fetch_price_history_df(hours=6)
+        features = engineer_features_cached(history)
+        return NumpyORJSONResponse(get_model_explanation_summary(features))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -124,14 +138,14 @@ def get_explainability():
 def get_shap(model_name: Optional[str] = None):
     """Get SHAP values"""
     try:
-        history = fetch_price_history(hours=6)
-        features = engineer_features(history)
+        history = fetch_price_history_df(hours=6)
+        features = engineer_features_cached(history)
         shap_data = get_shap_values(features, model_name)
         
         if shap_data is None:
             raise HTTPException(status_code=503, detail="SHAP calculation failed")
         
-        return shap_data
+        return NumpyORJSONResponse(shap_data)
     except HTTPException:
         raise
     except Exception as e:
@@ -144,7 +158,7 @@ def get_importance(model_name: Optional[str] = None):
     importance = get_feature_importance(model_name)
     if importance is None:
         raise HTTPException(status_code=503, detail="Feature importance unavailable")
-    return importance
+    return NumpyORJSONResponse(importance)
 
 
 # Market Analysis endpoints
@@ -152,9 +166,9 @@ def get_importance(model_name: Optional[str] = None):
 def get_trend():
     """Get market trend analysis"""
     try:
-        history = fetch_price_history(hours=24)
-        features = engineer_features(history)
-        return identify_trend(features['price'])
+        history = fetch_price_history_df(hours=24)
+        features = engineer_features_cached(history)
+        return NumpyORJSONResponse(identify_trend(features['price']))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -163,9 +177,9 @@ def get_trend():
 def get_eda():
     """Get EDA report"""
     try:
-        history = fetch_price_history(hours=24)
-        features = engineer_features(history)
-        return generate_eda_report(features)
+        history = fetch_price_history_df(hours=24)
+        features = engineer_features_cached(history)
+        return NumpyORJSONResponse(generate_eda_report(features))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
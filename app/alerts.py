@@ -1,8 +1,9 @@
 """Alert System - Price and Prediction Alerts"""
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque, Counter
+from itertools import islice
 
 from app.config import settings
 
@@ -11,61 +12,116 @@ logger = logging.getLogger(__name__)
 # Alert history
 alert_history: deque = deque(maxlen=100)
 
+# Running summary counters, kept in step with alert_history
+_by_type: Counter = Counter()
+_high_count = 0
+
+
+def _record_alert(alert: Dict[str, Any]):
+    """Append alert to history and update summary counters"""
+    global _high_count
+    
+    # Account for the entry the deque is about to evict
+    if len(alert_history) == alert_history.maxlen:
+        evicted = alert_history[0]
+        evicted_type = evicted.get("type", "unknown")
+        _by_type[evicted_type] -= 1
+        if not _by_type[evicted_type]:
+            del _by_type[evicted_type]
+        if evicted.get("severity") == "high":
+            _high_count -= 1
+    
+    alert_history.append(alert)
+    _by_type[alert.get("type", "unknown")] += 1
+    if alert.get("severity") == "high":
+        _high_count += 1
+
+
+# Bit flags returned by _alert_flags
+_PRICE_CHANGE = 1
+_HIGH_VOLATILITY = 2
+_PREDICTION_DEVIATION = 4
+
+
+def _alert_flags(current_price: float,
+                 previous_price: Optional[float],
+                 predicted_price: float,
+                 volatility: Optional[float]) -> Tuple[int, float, float]:
+    """Evaluate alert thresholds, returning (flags, change_pct, deviation)"""
+    flags = 0
+    change_pct = 0.0
+    deviation = 0.0
+    
+    if previous_price and previous_price > 0:
+        change_pct = (current_price - previous_price) / previous_price * 100
+        if abs(change_pct) > 5:
+            flags |= _PRICE_CHANGE
+    
+    if volatility is not None and volatility > 0.5:
+        flags |= _HIGH_VOLATILITY
+    
+    if predicted_price > 0:
+        deviation = abs(current_price - predicted_price) / current_price * 100
+        if deviation > 3:
+            flags |= _PREDICTION_DEVIATION
+    
+    return flags, change_pct, deviation
+
 
 def check_alerts(current_price: float, 
                  previous_price: float,
                  prediction: Optional[Dict[str, Any]] = None,
                  volatility: Optional[float] = None) -> List[Dict[str, Any]]:
     """Check various alert conditions"""
+    predicted = prediction.get("predicted_price", 0) if prediction else 0
+    flags, change_pct, deviation = _alert_flags(
+        current_price, previous_price, predicted, volatility
+    )
+    
+    # Common case: nothing fired, nothing to build
+    if not flags:
+        return []
+    
     alerts = []
+    timestamp = datetime.now().isoformat()
     
     # Price change alert
-    if previous_price and previous_price > 0:
-        change_pct = (current_price - previous_price) / previous_price * 100
-        
-        if abs(change_pct) > 5:
-            alert = {
-                "type": "price_change",
-                "severity": "high" if abs(change_pct) > 10 else "medium",
-                "message": f"Significant price change: {change_pct:+.2f}%",
-                "current_price": current_price,
-                "previous_price": previous_price,
-                "change_percent": round(change_pct, 2),
-                "timestamp": datetime.now().isoformat()
-            }
-            alerts.append(alert)
+    if flags & _PRICE_CHANGE:
+        alerts.append({
+            "type": "price_change",
+            "severity": "high" if abs(change_pct) > 10 else "medium",
+            "message": f"Significant price change: {change_pct:+.2f}%",
+            "current_price": current_price,
+            "previous_price": previous_price,
+            "change_percent": round(change_pct, 2),
+            "timestamp": timestamp
+        })
     
     # Volatility alert
-    if volatility is not None and volatility > 0.5:
-        alert = {
+    if flags & _HIGH_VOLATILITY:
+        alerts.append({
             "type": "high_volatility",
             "severity": "high" if volatility > 0.8 else "medium",
             "message": f"High volatility detected: {volatility:.2%}",
             "volatility": round(volatility, 4),
-            "timestamp": datetime.now().isoformat()
-        }
-        alerts.append(alert)
+            "timestamp": timestamp
+        })
     
     # Prediction deviation alert
-    if prediction:
-        predicted = prediction.get("predicted_price", 0)
-        if predicted > 0:
-            deviation = abs(current_price - predicted) / current_price * 100
-            if deviation > 3:
-                alert = {
-                    "type": "prediction_deviation",
-                    "severity": "medium",
-                    "message": f"Price deviating from prediction: {deviation:.2f}%",
-                    "current_price": current_price,
-                    "predicted_price": predicted,
-                    "deviation_percent": round(deviation, 2),
-                    "timestamp": datetime.now().isoformat()
-                }
-                alerts.append(alert)
+    if flags & _PREDICTION_DEVIATION:
+        alerts.append({
+            "type": "prediction_deviation",
+            "severity": "medium",
+            "message": f"Price deviating from prediction: {deviation:.2f}%",
+            "current_price": current_price,
+            "predicted_price": predicted,
+            "deviation_percent": round(deviation, 2),
+            "timestamp": timestamp
+        })
     
     # Store alerts
     for alert in alerts:
-        alert_history.append(alert)
+        _record_alert(alert)
         logger.info(f"Alert: {alert['type']} - {alert['message']}")
     
     return alerts
@@ -89,43 +145,39 @@ def check_drawdown_alert(current_price: float,
             "drawdown_percent": round(drawdown, 2),
             "timestamp": datetime.now().isoformat()
         }
-        alert_history.append(alert)
+        _record_alert(alert)
         return alert
     
     return None
 
 
-def get_alert_history(limit: int = 20) -> List[Dict[str, Any]]:
-    """Get recent alerts"""
-    return list(alert_history)[-limit:]
+def get_alert_history(limit: int = 20,
+                      type_filter: Optional[str] = None,
+                      severity_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get recent alerts (oldest first), optionally only one type/severity"""
+    # Walk back from the newest entry so only as many items as needed are touched
+    alerts = reversed(alert_history)
+    if type_filter is not None or severity_filter is not None:
+        alerts = (
+            a for a in alerts
+            if (type_filter is None or a.get("type") == type_filter)
+            and (severity_filter is None or a.get("severity") == severity_filter)
+        )
+    return list(islice(alerts, limit))[::-1]
 
 
 def get_alert_summary() -> Dict[str, Any]:
     """Get alert statistics"""
-    if not alert_history:
-        return {
-            "total_alerts": 0,
-            "high_severity": 0,
-            "by_type": {}
-        }
-    
-    by_type = {}
-    high_count = 0
-    
-    for alert in alert_history:
-        t = alert.get("type", "unknown")
-        by_type[t] = by_type.get(t, 0) + 1
-        if alert.get("severity") == "high":
-            high_count += 1
-    
     return {
         "total_alerts": len(alert_history),
-        "high_severity": high_count,
-        "by_type": by_type
+        "high_severity": _high_count,
+        "by_type": dict(_by_type)
     }
 
 
 def clear_alerts():
     """Clear alert history"""
+    global _high_count
     alert_history.clear()
-
+    _by_type.clear()
+    _high_count = 0
@@ -1,5 +1,6 @@
 """CryptoSentinel Configuration - Python 3.11 Compatible"""
 import os
+from functools import lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings
 
@@ -8,6 +9,10 @@ class Settings(BaseSettings):
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    # Prediction history, alerts and reloaded models live in process memory -
+    # raise only once those go through shared storage or a single writer
+    API_WORKERS: int = 1
+    API_THREAD_LIMIT: int = 128
     DEBUG: bool = True
     
     # Data
@@ -16,6 +21,9 @@ class Settings(BaseSettings):
     PREDICTION_MINUTES: int = 30
     TRAINING_INTERVAL_MINUTES: int = 30
     PREDICTION_REFRESH_MINUTES: int = 5
+    FETCH_CACHE_TTL_SECONDS: int = 30
+    PREDICTION_SYNC_MINUTES: int = 5
+    PREDICT_ALL_MODELS: bool = False
     
     # Validation tolerance (percentage)
     DIRECTION_TOLERANCE_PCT: float = 0.1
@@ -53,31 +61,48 @@ class Settings(BaseSettings):
     }
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Build Settings once (reads env and .env) and share it process-wide"""
+    return Settings()
 
-# Load Prefect variables if available (when running in Prefect context)
-try:
-    from prefect import variables
-    hopsworks_key = variables.get("hopsworks_api_key", default=None)
-    hopsworks_project = variables.get("hopsworks_project_name", default=None)
-    
-    if hopsworks_key:
-        settings.HOPSWORKS_API_KEY = hopsworks_key
-    elif not settings.HOPSWORKS_API_KEY:
-        settings.HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY", "")
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=None)
+def load_hopsworks_settings() -> Settings:
+    """Resolve Hopsworks credentials once, on first use.
+
+    Prefect variables take precedence (when running in Prefect), then
+    environment variables.
+    """
+    try:
+        from prefect import variables
+        hopsworks_key = variables.get("hopsworks_api_key", default=None)
+        hopsworks_project = variables.get("hopsworks_project_name", default=None)
+        
+        if hopsworks_key:
+            settings.HOPSWORKS_API_KEY = hopsworks_key
+        elif not settings.HOPSWORKS_API_KEY:
+            settings.HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY", "")
+        
+        if hopsworks_project:
+            settings.HOPSWORKS_PROJECT_NAME = hopsworks_project
+        elif settings.HOPSWORKS_PROJECT_NAME == "CryptoSentinel":
+            settings.HOPSWORKS_PROJECT_NAME = os.getenv("HOPSWORKS_PROJECT_NAME", "CryptoSentinel")
+    except Exception:
+        # Not in Prefect context, use environment variables
+        if not settings.HOPSWORKS_API_KEY:
+            settings.HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY", "")
+        if settings.HOPSWORKS_PROJECT_NAME == "CryptoSentinel":
+            settings.HOPSWORKS_PROJECT_NAME = os.getenv("HOPSWORKS_PROJECT_NAME", "CryptoSentinel")
     
-    if hopsworks_project:
-        settings.HOPSWORKS_PROJECT_NAME = hopsworks_project
-    elif settings.HOPSWORKS_PROJECT_NAME == "CryptoSentinel":
-        settings.HOPSWORKS_PROJECT_NAME = os.getenv("HOPSWORKS_PROJECT_NAME", "CryptoSentinel")
-except Exception:
-    # Not in Prefect context, use environment variables
-    if not settings.HOPSWORKS_API_KEY:
-        settings.HOPSWORKS_API_KEY = os.getenv("HOPSWORKS_API_KEY", "")
-    if settings.HOPSWORKS_PROJECT_NAME == "CryptoSentinel":
-        settings.HOPSWORKS_PROJECT_NAME = os.getenv("HOPSWORKS_PROJECT_NAME", "CryptoSentinel")
+    return settings
 
-# Create directories
-settings.MODEL_DIR.mkdir(parents=True, exist_ok=True)
-settings.ACTIVE_MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+@lru_cache(maxsize=None)
+def ensure_dirs():
+    """Create model directories (only needed by code that writes models)"""
+    settings.MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    settings.ACTIVE_MODEL_DIR.mkdir(parents=True, exist_ok=True)
@@ -1,37 +1,152 @@
 """Data Ingestion - CoinGecko API"""
+import numpy as np
+import orjson
+import pandas as pd
 import requests
+import requests_cache
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any
+from dateutil import tz
+from typing import List, Dict, Any, Tuple
+import functools
+import inspect
 import logging
+import threading
 import time
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 COINGECKO_URL = "https://api.coingecko.com/api/v3"
 
 # Rate limiting
-_last_request_time = 0
+_last_request_time = 0.0  # time.monotonic() of the latest reserved send slot
 _min_request_interval = 1.5  # Minimum 1.5 seconds between requests
+_rate_limit_lock = threading.Lock()
 
 
 def _rate_limit():
-    """Simple rate limiting to avoid 429 errors"""
+    """Simple rate limiting to avoid 429 errors (safe across threads).
+
+    Each caller reserves the next free send slot under the lock and sleeps
+    outside it, so concurrent fetches wait for their own slot only.
+    """
     global _last_request_time
-    current_time = time.time()
-    time_since_last = current_time - _last_request_time
+    with _rate_limit_lock:
+        now = time.monotonic()
+        slot = max(now, _last_request_time + _min_request_interval)
+        _last_request_time = slot
     
-    if time_since_last < _min_request_interval:
-        sleep_time = _min_request_interval - time_since_last
-        time.sleep(sleep_time)
+    if slot > now:
+        time.sleep(slot - now)
+
+
+class _RateLimitedAdapter(requests.adapters.HTTPAdapter):
+    """HTTP adapter that rate-limits requests actually sent over the network.
+
+    requests_cache only reaches the adapter on a cache miss or revalidation,
+    so cached responses are served without waiting for a send slot.
+    """
     
-    _last_request_time = time.time()
+    def send(self, request, **kwargs):
+        _rate_limit()
+        return super().send(request, **kwargs)
+
+
+# Shared HTTP session - keeps TLS connections to CoinGecko alive between calls and
+# revalidates expired responses with ETag/Last-Modified instead of refetching them
+_session = requests_cache.CachedSession(
+    backend="memory",
+    expire_after=settings.FETCH_CACHE_TTL_SECONDS,
+    cache_control=True
+)
+_session.mount("https://", _RateLimitedAdapter(pool_connections=1, pool_maxsize=10))
+
+
+# Response cache - entries are (expires_at, value), keyed by fetcher + arguments.
+# Least recently used entries go first once it is full; expired ones are dropped
+# whenever an entry is refreshed
+_RESPONSE_CACHE_SIZE = 8
+_response_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+# Per-key fetch locks, kept only for keys that are cached or being fetched
+_key_locks: Dict[Tuple, threading.Lock] = {}
+
+
+def _cached_response(key: Tuple) -> Tuple[bool, Any]:
+    """(hit, value) for a fresh cache entry, marking it recently used"""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return False, None
+        _response_cache.move_to_end(key)
+        return True, entry[1]
+
+
+def _store_response(key: Tuple, value: Any):
+    """Cache a fresh value, then drop expired and least recently used entries"""
+    with _response_cache_lock:
+        now = time.monotonic()
+        _response_cache[key] = (now + settings.FETCH_CACHE_TTL_SECONDS, value)
+        _response_cache.move_to_end(key)
+        
+        for stale in [k for k, (expires_at, _) in _response_cache.items() if expires_at <= now]:
+            del _response_cache[stale]
+        while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+        
+        for idle in [k for k, lock in _key_locks.items()
+                     if k not in _response_cache and not lock.locked()]:
+            del _key_locks[idle]
+
+
+def _ttl_cached(func):
+    """Cache fetcher results for FETCH_CACHE_TTL_SECONDS.
+
+    Concurrent callers for the same key share a single network fetch: only
+    the first caller refreshes an expired entry, the rest wait on its lock.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, tuple(bound.arguments.items()))
+
+        hit, value = _cached_response(key)
+        if hit:
+            return value
 
+        with _response_cache_lock:
+            lock = _key_locks.setdefault(key, threading.Lock())
 
+        with lock:
+            # Another caller may have refreshed the entry while we waited
+            hit, value = _cached_response(key)
+            if hit:
+                return value
+
+            value = func(*args, **kwargs)
+            _store_response(key, value)
+            return value
+
+    return wrapper
+
+
+def clear_cache():
+    """Drop all cached API responses"""
+    with _response_cache_lock:
+        _response_cache.clear()
+    _session.cache.clear()
+
+
+@_ttl_cached
 def fetch_current_price() -> Dict[str, Any]:
     """Fetch current Bitcoin price from CoinGecko"""
     try:
-        _rate_limit()
-        resp = requests.get(
+        resp = _session.get(
             f"{COINGECKO_URL}/simple/price",
             params={
                 "ids": "bitcoin",
@@ -41,7 +156,7 @@ def fetch_current_price() -> Dict[str, Any]:
             timeout=10
         )
         resp.raise_for_status()
-        btc = resp.json().get("bitcoin", {})
+        btc = orjson.loads(resp.content).get("bitcoin", {})
         price = btc.get("usd", 0)
         change = btc.get("usd_24h_change", 0)
         return {
@@ -54,11 +169,14 @@ def fetch_current_price() -> Dict[str, Any]:
         raise
 
 
-def fetch_price_history(hours: int = 24) -> List[Dict[str, Any]]:
-    """Fetch historical price data"""
+@_ttl_cached
+def fetch_price_history_df(hours: int = 24) -> pd.DataFrame:
+    """Fetch historical price data as columns (timestamp in ms, price).
+
+    The result is cached and shared between callers - do not mutate it.
+    """
     try:
-        _rate_limit()
-        resp = requests.get(
+        resp = _session.get(
             f"{COINGECKO_URL}/coins/bitcoin/market_chart",
             params={
                 "vs_currency": "usd",
@@ -67,25 +185,46 @@ def fetch_price_history(hours: int = 24) -> List[Dict[str, Any]]:
             timeout=10
         )
         resp.raise_for_status()
-        prices = resp.json().get("prices", [])
-        return [
-            {
-                "timestamp": int(ts),
-                "price": round(p, 2),
-                "time": datetime.fromtimestamp(ts / 1000).strftime("%I:%M %p")
-            }
-            for ts, p in prices
-        ]
+        prices = orjson.loads(resp.content).get("prices", [])
+        arr = np.asarray(prices, dtype=np.float64).reshape(-1, 2)
+        return pd.DataFrame({
+            "timestamp": arr[:, 0].astype(np.int64),
+            "price": np.round(arr[:, 1], 2)
+        })
     except Exception as e:
         logger.error(f"History fetch error: {e}")
         raise
 
 
+@_ttl_cached
+def fetch_price_history(hours: int = 24) -> List[Dict[str, Any]]:
+    """Fetch historical price data"""
+    df = fetch_price_history_df(hours)
+    if df.empty:
+        return []
+    
+    # One fixed offset is only right if the window doesn't span a DST change;
+    # otherwise use the real local zone (slower: pandas converts per element)
+    stamps = df["timestamp"].to_numpy()
+    edge_zones = {datetime.fromtimestamp(t / 1000).astimezone().tzinfo
+                  for t in (stamps.min(), stamps.max())}
+    local_tz = edge_zones.pop() if len(edge_zones) == 1 else tz.tzlocal()
+    times = (
+        pd.to_datetime(stamps, unit="ms", utc=True)
+        .tz_convert(local_tz)
+        .strftime("%I:%M %p")
+    )
+    return [
+        {"timestamp": ts, "price": p, "time": t}
+        for ts, p, t in zip(df["timestamp"].tolist(), df["price"].tolist(), times)
+    ]
+
+
+@_ttl_cached
 def fetch_ohlcv_data(hours: int = 24) -> List[Dict[str, Any]]:
     """Fetch OHLCV candle data"""
     try:
-        _rate_limit()
-        resp = requests.get(
+        resp = _session.get(
             f"{COINGECKO_URL}/coins/bitcoin/ohlc",
             params={
                 "vs_currency": "usd",
@@ -94,27 +233,22 @@ def fetch_ohlcv_data(hours: int = 24) -> List[Dict[str, Any]]:
             timeout=10
         )
         resp.raise_for_status()
-        return [
-            {
-                "timestamp": int(c[0]),
-                "open": round(c[1], 2),
-                "high": round(c[2], 2),
-                "low": round(c[3], 2),
-                "close": round(c[4], 2),
-                "volume": 0
-            }
-            for c in resp.json()
-        ]
+        # Candles arrive as [timestamp, open, high, low, close] rows
+        arr = np.asarray(orjson.loads(resp.content), dtype=np.float64).reshape(-1, 5)
+        df = pd.DataFrame(np.round(arr[:, 1:], 2), columns=["open", "high", "low", "close"])
+        df.insert(0, "timestamp", arr[:, 0].astype(np.int64))
+        df["volume"] = 0
+        return df.to_dict("records")
     except Exception as e:
         logger.error(f"OHLCV fetch error: {e}")
         raise
 
 
+@_ttl_cached
 def fetch_market_data() -> Dict[str, Any]:
     """Fetch comprehensive market data"""
     try:
-        _rate_limit()
-        resp = requests.get(
+        resp = _session.get(
             f"{COINGECKO_URL}/coins/bitcoin",
             params={
                 "localization": "false",
@@ -125,7 +259,7 @@ def fetch_market_data() -> Dict[str, Any]:
             timeout=10
         )
         resp.raise_for_status()
-        md = resp.json().get("market_data", {})
+        md = orjson.loads(resp.content).get("market_data", {})
         return {
             "current_price": md.get("current_price", {}).get("usd", 0),
             "market_cap": md.get("market_cap", {}).get("usd", 0),
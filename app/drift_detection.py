@@ -3,6 +3,7 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
+import numpy as np
 import pandas as pd
 
 from app.config import settings
@@ -12,12 +13,19 @@ logger = logging.getLogger(__name__)
 # Global state - single report and reference data
 _drift_report: Optional[Dict[str, Any]] = None
 _reference_data: Optional[pd.DataFrame] = None
+_reference_sorted: Dict[str, np.ndarray] = {}
 
 
 def set_reference_data(df: pd.DataFrame):
     """Set baseline data for drift comparison"""
-    global _reference_data
+    global _reference_data, _reference_sorted
     _reference_data = df.copy()
+    # Pre-sorted, NaN-free numeric columns for the KS fallback
+    _reference_sorted = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            values = df[col].to_numpy(np.float64)
+            _reference_sorted[col] = np.sort(values[~np.isnan(values)])
     logger.info(f"Reference data set: {len(df)} samples")
 
 
@@ -28,12 +36,14 @@ def detect_drift(current_data: pd.DataFrame, feature_columns: List[str]) -> Dict
     """
     global _drift_report, _reference_data
     
+    timestamp = datetime.now().isoformat()
+    
     if _reference_data is None:
         return {
             "drift_detected": False,
             "drift_score": 0.0,
             "message": "No reference data set",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     
     try:
@@ -41,7 +51,13 @@ def detect_drift(current_data: pd.DataFrame, feature_columns: List[str]) -> Dict
         from deepchecks.tabular import Dataset
         from deepchecks.tabular.checks import DatasetDrift
         
-        ref_dataset = Dataset(_reference_data[feature_columns], label=None)
+        # Reference is normally stored with exactly these columns - skip the projection
+        if list(_reference_data.columns) == list(feature_columns):
+            ref_features = _reference_data
+        else:
+            ref_features = _reference_data[feature_columns]
+        
+        ref_dataset = Dataset(ref_features, label=None)
         cur_dataset = Dataset(current_data[feature_columns], label=None)
         
         result = DatasetDrift().run(ref_dataset, cur_dataset)
@@ -53,7 +69,7 @@ def detect_drift(current_data: pd.DataFrame, feature_columns: List[str]) -> Dict
             "threshold": settings.DRIFT_THRESHOLD,
             "feature_drifts": result.value.get('feature_drifts', {}),
             "method": "deepchecks",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
         
         logger.info(f"Drift check: score={score:.4f}, detected={_drift_report['drift_detected']}")
@@ -61,19 +77,28 @@ def detect_drift(current_data: pd.DataFrame, feature_columns: List[str]) -> Dict
         
     except ImportError:
         logger.warning("DeepChecks not available, using KS-test fallback")
-        return _simple_drift_detection(current_data, feature_columns)
+        return _simple_drift_detection(current_data, feature_columns, timestamp)
     except Exception as e:
         logger.error(f"Drift detection error: {e}")
         return {
             "drift_detected": False,
             "drift_score": 0.0,
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
 
 
+def _ks_statistic(ref_sorted: np.ndarray, cur_sorted: np.ndarray) -> float:
+    """Two-sample KS statistic for two sorted, NaN-free samples"""
+    values = np.concatenate([ref_sorted, cur_sorted])
+    cdf_ref = np.searchsorted(ref_sorted, values, side='right') / len(ref_sorted)
+    cdf_cur = np.searchsorted(cur_sorted, values, side='right') / len(cur_sorted)
+    return float(np.max(np.abs(cdf_ref - cdf_cur)))
+
+
 def _simple_drift_detection(current_data: pd.DataFrame, 
-                           feature_columns: List[str]) -> Dict[str, Any]:
+                           feature_columns: List[str],
+                           timestamp: Optional[str] = None) -> Dict[str, Any]:
     """Fallback: KS-test for each feature"""
     global _drift_report, _reference_data
     
@@ -83,21 +108,34 @@ def _simple_drift_detection(current_data: pd.DataFrame,
     from scipy import stats
     
     feature_drifts = {}
-    total = 0.0
-    
-    for col in feature_columns:
-        if col in _reference_data.columns and col in current_data.columns:
-            ref_vals = _reference_data[col].dropna()
-            cur_vals = current_data[col].dropna()
-            
-            if len(ref_vals) > 0 and len(cur_vals) > 0:
-                stat, pval = stats.ks_2samp(ref_vals, cur_vals)
-                feature_drifts[col] = {
-                    "statistic": float(stat),
-                    "p_value": float(pval),
-                    "drifted": pval < 0.05
-                }
-                total += stat
+    
+    # Project the current data to one float64 block, then slice columns by index
+    columns = [c for c in feature_columns
+               if c in _reference_sorted and c in current_data.columns]
+    current_np = current_data[columns].to_numpy(np.float64)
+    
+    tested, statistics, sizes = [], [], []
+    for i, col in enumerate(columns):
+        ref_vals = _reference_sorted[col]
+        cur_vals = current_np[:, i]
+        cur_vals = np.sort(cur_vals[~np.isnan(cur_vals)])
+        
+        if len(ref_vals) > 0 and len(cur_vals) > 0:
+            tested.append(col)
+            statistics.append(_ks_statistic(ref_vals, cur_vals))
+            sizes.append(len(ref_vals) * len(cur_vals) / (len(ref_vals) + len(cur_vals)))
+    
+    # Asymptotic two-sided p-values for all features in one call (as ks_2samp 'asymp')
+    statistics = np.asarray(statistics, dtype=np.float64)
+    p_values = np.clip(stats.kstwo.sf(statistics, np.round(sizes)), 0, 1)
+    
+    for col, stat, pval in zip(tested, statistics, p_values):
+        feature_drifts[col] = {
+            "statistic": float(stat),
+            "p_value": float(pval),
+            "drifted": bool(pval < 0.05)
+        }
+    total = float(statistics.sum())
     
     avg_score = total / len(feature_columns) if feature_columns else 0
     
@@ -107,7 +145,7 @@ def _simple_drift_detection(current_data: pd.DataFrame,
         "threshold": settings.DRIFT_THRESHOLD,
         "feature_drifts": feature_drifts,
         "method": "ks_test",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": timestamp or datetime.now().isoformat()
     }
     
     logger.info(f"Drift check (KS): score={avg_score:.4f}, detected={_drift_report['drift_detected']}")
@@ -130,16 +168,18 @@ def check_data_quality(df: pd.DataFrame) -> Dict[str, Any]:
         "total_rows": len(df),
         "total_columns": len(df.columns),
         "missing_values": {},
-        "duplicates": int(df.duplicated().sum()),
+        "duplicates": int(df.duplicated().to_numpy().sum()),
         "timestamp": datetime.now().isoformat()
     }
     
-    for col in df.columns:
-        missing = int(df[col].isna().sum())
-        if missing > 0:
-            report["missing_values"][col] = {
-                "count": missing,
-                "pct": round(missing / len(df) * 100, 2)
-            }
+    # One reduction over all columns, then keep only those with gaps
+    missing_per_col = df.isna().sum(axis=0)
+    missing_per_col = missing_per_col[missing_per_col > 0]
+    
+    for col, missing in missing_per_col.items():
+        report["missing_values"][col] = {
+            "count": int(missing),
+            "pct": round(int(missing) / len(df) * 100, 2)
+        }
     
     return report
@@ -1,9 +1,14 @@
 """Exploratory Data Analysis - Trends and Anomalies"""
 import logging
+import math
+import warnings
 from typing import Dict, Any, List, Tuple
 
 import numpy as np
 import pandas as pd
+from scipy import stats as scipy_stats
+
+from app.feature_engineering import rolling_mean_std
 
 logger = logging.getLogger(__name__)
 
@@ -52,22 +57,25 @@ def detect_anomalies(prices: pd.Series, std_threshold: float = 2.0
     if len(prices) < 20:
         return []
     
-    mean = prices.rolling(window=20).mean()
-    std = prices.rolling(window=20).std()
-    z_scores = (prices - mean) / std
-    
-    anomalies = []
-    for i, (idx, z) in enumerate(z_scores.items()):
-        if abs(z) > std_threshold:
-            anomalies.append({
-                "timestamp": str(idx),
-                "price": round(float(prices.iloc[i]), 2),
-                "z_score": round(float(z), 2),
-                "type": "spike" if z > 0 else "drop",
-                "severity": "high" if abs(z) > 3 else "medium"
-            })
-    
-    return anomalies[-10:]  # Return last 10
+    values = prices.to_numpy(dtype=np.float64)
+    mean, std = rolling_mean_std(values, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = (values - mean) / std
+    
+    # Only the last 10 hits are reported, so build dicts for just those
+    hits = np.flatnonzero(np.abs(z_scores) > std_threshold)[-10:]
+    index = prices.index
+    
+    return [
+        {
+            "timestamp": str(index[i]),
+            "price": round(float(values[i]), 2),
+            "z_score": round(float(z_scores[i]), 2),
+            "type": "spike" if z_scores[i] > 0 else "drop",
+            "severity": "high" if abs(z_scores[i]) > 3 else "medium"
+        }
+        for i in hits
+    ]
 
 
 def calculate_statistics(df: pd.DataFrame) -> Dict[str, Any]:
@@ -76,31 +84,63 @@ def calculate_statistics(df: pd.DataFrame) -> Dict[str, Any]:
         return {}
     
     prices = df['price']
+    values = _finite(prices)
+    # One pass for count/minmax/mean/variance/skew/kurtosis (pandas' unbiased forms)
+    d = _describe(values)
     
     stats = {
         "count": len(prices),
-        "mean": round(prices.mean(), 2),
-        "median": round(prices.median(), 2),
-        "std": round(prices.std(), 2),
-        "min": round(prices.min(), 2),
-        "max": round(prices.max(), 2),
-        "range": round(prices.max() - prices.min(), 2),
-        "skewness": round(float(prices.skew()), 4),
-        "kurtosis": round(float(prices.kurtosis()), 4)
+        "mean": round(d["mean"], 2),
+        "median": round(float(np.median(values)) if len(values) else np.nan, 2),
+        "std": round(d["std"], 2),
+        "min": round(d["min"], 2),
+        "max": round(d["max"], 2),
+        "range": round(d["max"] - d["min"], 2),
+        "skewness": round(d["skewness"], 4),
+        "kurtosis": round(d["kurtosis"], 4)
     }
     
     # Returns statistics
     if 'returns' in df.columns:
-        returns = df['returns'].dropna()
-        stats["returns_mean"] = round(returns.mean() * 100, 4)
-        stats["returns_std"] = round(returns.std() * 100, 4)
+        r = _describe(_finite(df['returns']))
+        stats["returns_mean"] = round(r["mean"] * 100, 4)
+        stats["returns_std"] = round(r["std"] * 100, 4)
         stats["sharpe_ratio"] = round(
-            returns.mean() / returns.std() * np.sqrt(252) if returns.std() > 0 else 0, 4
+            r["mean"] / r["std"] * np.sqrt(252) if r["std"] > 0 else 0, 4
         )
     
     return stats
 
 
+def _finite(series: pd.Series) -> np.ndarray:
+    """Float values of a series with NaNs dropped"""
+    values = series.to_numpy(dtype=np.float64)
+    return values[~np.isnan(values)]
+
+
+def _describe(values: np.ndarray) -> Dict[str, float]:
+    """Summary moments via scipy.stats.describe, NaN where undefined"""
+    n = len(values)
+    result = dict.fromkeys(("mean", "std", "min", "max", "skewness", "kurtosis"), np.nan)
+    if n == 0:
+        return result
+    
+    with warnings.catch_warnings():
+        # Constant data trips scipy's precision-loss warning; handled below
+        warnings.simplefilter("ignore", RuntimeWarning)
+        d = scipy_stats.describe(values, bias=False)
+    result["min"], result["max"] = float(d.minmax[0]), float(d.minmax[1])
+    result["mean"] = float(d.mean)
+    if n > 1:
+        result["std"] = math.sqrt(d.variance)
+    # pandas needs 3 (skew) / 4 (kurtosis) points and reports 0 for constant data
+    if n > 2:
+        result["skewness"] = float(d.skewness) if d.variance > 0 else 0.0
+    if n > 3:
+        result["kurtosis"] = float(d.kurtosis) if d.variance > 0 else 0.0
+    return result
+
+
 def calculate_correlation_matrix(df: pd.DataFrame, 
                                  features: List[str] = None
                                 ) -> Dict[str, Any]:
@@ -112,7 +152,13 @@ def calculate_correlation_matrix(df: pd.DataFrame,
     if len(available) < 2:
         return {"error": "Insufficient features for correlation"}
     
-    corr_matrix = df[available].corr()
+    arr = df[available].to_numpy(dtype=np.float64)
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(arr, rowvar=False)
+    # Zero-variance columns have no defined correlation - report 0
+    corr = np.nan_to_num(corr, nan=0.0)
+    corr_matrix = pd.DataFrame(corr, index=available, columns=available)
     
     return {
         "features": available,
@@ -124,19 +170,32 @@ def calculate_correlation_matrix(df: pd.DataFrame,
 def _get_top_correlations(corr_matrix: pd.DataFrame, n: int = 5
                          ) -> List[Dict[str, Any]]:
     """Get top N correlations"""
-    correlations = []
-    
-    for i, col1 in enumerate(corr_matrix.columns):
-        for j, col2 in enumerate(corr_matrix.columns):
-            if i < j:  # Upper triangle only
-                correlations.append({
-                    "feature_1": col1,
-                    "feature_2": col2,
-                    "correlation": round(corr_matrix.loc[col1, col2], 4)
-                })
-    
-    correlations.sort(key=lambda x: abs(x["correlation"]), reverse=True)
-    return correlations[:n]
+    columns = corr_matrix.columns
+    rows, cols = np.triu_indices(len(columns), k=1)  # Upper triangle only
+    if n <= 0 or len(rows) == 0:
+        return []
+    
+    values = corr_matrix.to_numpy()[rows, cols]
+    strength = np.abs(np.round(values, 4))
+    
+    # Partial selection of the n strongest, then order just those; ties keep
+    # matrix order, as the full sort did
+    top = np.arange(len(values))
+    if len(values) > n:
+        cutoff = -np.partition(-strength, n - 1)[n - 1]
+        above = np.flatnonzero(strength > cutoff)
+        tied = np.flatnonzero(strength == cutoff)[:n - len(above)]
+        top = np.sort(np.concatenate([above, tied]))
+    top = top[np.argsort(-strength[top], kind='stable')]
+    
+    return [
+        {
+            "feature_1": columns[rows[i]],
+            "feature_2": columns[cols[i]],
+            "correlation": round(float(values[i]), 4)
+        }
+        for i in top
+    ]
 
 
 def generate_eda_report(df: pd.DataFrame) -> Dict[str, Any]:
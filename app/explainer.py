@@ -1,6 +1,6 @@
 """Model Explainability - SHAP, LIME, and Feature Importance"""
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -12,33 +12,142 @@ from app.feature_engineering import get_feature_names
 
 logger = logging.getLogger(__name__)
 
+# TreeExplainer per model name, stored with the model it was built from so a
+# reloaded model is never explained with a stale tree walk
+_tree_explainers: Dict[str, Tuple[Any, Any]] = {}
+
+# LIME only depends on its background sample (the request's feature history),
+# so the most recent explainer is reused while that history is unchanged
+_LIME_BACKGROUND_ROWS = 5000
+_lime_explainer: Optional[Tuple[Tuple[Any, ...], LimeTabularExplainer]] = None
+
+
+def _get_tree_explainer(model_name: str, model: Any) -> Any:
+    """Cached shap.TreeExplainer for a loaded model"""
+    cached = _tree_explainers.get(model_name)
+    if cached is not None and cached[0] is model:
+        return cached[1]
+    explainer = shap.TreeExplainer(model)
+    _tree_explainers[model_name] = (model, explainer)
+    return explainer
+
+
+def _get_lime_explainer(X: pd.DataFrame) -> LimeTabularExplainer:
+    """LimeTabularExplainer over (a sample of) X, reused for the same history"""
+    global _lime_explainer
+    key = (tuple(X.columns), len(X), X.index[0], X.index[-1])
+    cached = _lime_explainer
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    # LIME builds its mean/std/quartile bins over the whole background
+    background = X.to_numpy()
+    if len(background) > _LIME_BACKGROUND_ROWS:
+        rows = np.random.RandomState(42).choice(
+            len(background), _LIME_BACKGROUND_ROWS, replace=False
+        )
+        background = background[np.sort(rows)]
+    
+    explainer = LimeTabularExplainer(
+        background,
+        feature_names=list(X.columns),
+        mode='regression',
+        discretize_continuous=True
+    )
+    _lime_explainer = (key, explainer)
+    return explainer
+
+
+def _top_indices(strength: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first; ties keep input order"""
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.arange(len(strength))
+    if len(strength) > k:
+        cutoff = np.partition(strength, len(strength) - k)[len(strength) - k]
+        above = np.flatnonzero(strength > cutoff)
+        tied = np.flatnonzero(strength == cutoff)[:k - len(above)]
+        top = np.sort(np.concatenate([above, tied]))
+    return top[np.argsort(-strength[top], kind='stable')]
+
+
+def _scaled_predict_fn(model: Any, scaler: Any):
+    """Prediction function for LIME - applies the scaler to each perturbation batch.
+
+    A fitted StandardScaler is applied directly from its mean_/scale_ into one
+    float32 buffer per batch, skipping transform()'s validation and copies.
+    """
+    if not scaler:
+        return lambda x: model.predict(np.asarray(x, dtype=np.float32))
+    
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    if mean is None or scale is None:
+        return lambda x: model.predict(scaler.transform(x))
+    
+    mean = mean.astype(np.float32)
+    scale = scale.astype(np.float32)
+    
+    def predict_fn(x):
+        # Own buffer per call: LIME keeps its input, and requests run concurrently
+        scaled = np.subtract(x, mean, dtype=np.float32)
+        np.divide(scaled, scale, out=scaled)
+        return model.predict(scaled)
+    
+    return predict_fn
+
+
+def clear_explainer_cache():
+    """Drop cached explainers (call after models are reloaded)"""
+    global _lime_explainer
+    _tree_explainers.clear()
+    _lime_explainer = None
+
+
+def _prepare_explain_inputs(model_name: Optional[str] = None
+                            ) -> Optional[Tuple[str, Any, List[str]]]:
+    """Resolve the model and feature columns shared by every explainer"""
+    if not ensure_models_loaded():
+        return None
+    
+    if model_name is None:
+        model_name = model_loader.best_model_name
+    
+    model = model_loader.models.get(model_name)
+    if model is None:
+        logger.warning(f"Model {model_name} not found")
+        return None
+    
+    return model_name, model, get_feature_names()
+
 
 def get_shap_values(features: pd.DataFrame, model_name: Optional[str] = None
                    ) -> Optional[Dict[str, Any]]:
     """Calculate SHAP values for model explanation"""
-    if not ensure_models_loaded():
+    inputs = _prepare_explain_inputs(model_name)
+    if inputs is None:
         return None
-    
+    return _shap_from_inputs(features, *inputs)
+
+
+def _shap_from_inputs(features: pd.DataFrame, model_name: str, model: Any,
+                      feature_cols: List[str]) -> Optional[Dict[str, Any]]:
+    """SHAP values for the last row, given a resolved model"""
     try:
-        if model_name is None:
-            model_name = model_loader.best_model_name
-        
-        model = model_loader.models.get(model_name)
-        if model is None:
-            logger.warning(f"Model {model_name} not found")
-            return None
-        
-        feature_cols = get_feature_names()
-        X = features[feature_cols].copy()
+        is_tree = model_name in ["xgboost", "random_forest", "gradient_boosting"]
+        # Only the last row is explained; other explainers also need the
+        # history as background
+        X = features[feature_cols].iloc[-1:] if is_tree else features[feature_cols]
+        X = X.astype(np.float32)
         
         if model_loader.scaler:
             X_scaled = model_loader.scaler.transform(X)
         else:
-            X_scaled = X.values
+            X_scaled = X.to_numpy()
         
         # Use TreeExplainer for tree-based models
-        if model_name in ["xgboost", "random_forest", "gradient_boosting"]:
-            explainer = shap.TreeExplainer(model)
+        if is_tree:
+            explainer = _get_tree_explainer(model_name, model)
         else:
             explainer = shap.Explainer(model, X_scaled)
         
@@ -50,16 +159,15 @@ def get_shap_values(features: pd.DataFrame, model_name: Optional[str] = None
         values = shap_values.flatten()
         
         # Create feature importance from SHAP
-        importance = list(zip(feature_cols, values))
-        importance.sort(key=lambda x: abs(x[1]), reverse=True)
+        top = _top_indices(np.abs(values), 10)
         
         return {
             "model_name": model_name,
             "feature_names": feature_cols,
             "shap_values": values.tolist(),
             "top_features": [
-                {"feature": f, "importance": round(float(v), 4)}
-                for f, v in importance[:10]
+                {"feature": feature_cols[i], "importance": round(float(values[i]), 4)}
+                for i in top
             ],
             "expected_value": float(explainer.expected_value) 
                 if hasattr(explainer, 'expected_value') 
@@ -72,22 +180,21 @@ def get_shap_values(features: pd.DataFrame, model_name: Optional[str] = None
         return None
 
 
-def get_feature_importance(model_name: Optional[str] = None
+def get_feature_importance(model_name: Optional[str] = None,
+                           top_k: Optional[int] = None
                           ) -> Optional[Dict[str, float]]:
-    """Get feature importance from model"""
-    if not ensure_models_loaded():
+    """Get feature importance from model, strongest first (optionally only top_k)"""
+    inputs = _prepare_explain_inputs(model_name)
+    if inputs is None:
         return None
-    
+    _, model, feature_cols = inputs
+    return _importance_from_model(model, feature_cols, top_k)
+
+
+def _importance_from_model(model: Any, feature_cols: List[str],
+                           top_k: Optional[int] = None) -> Optional[Dict[str, float]]:
+    """Built-in importances (or |coef|) of a resolved model"""
     try:
-        if model_name is None:
-            model_name = model_loader.best_model_name
-        
-        model = model_loader.models.get(model_name)
-        if model is None:
-            return None
-        
-        feature_cols = get_feature_names()
-        
         if hasattr(model, "feature_importances_"):
             importances = model.feature_importances_
         elif hasattr(model, "coef_"):
@@ -95,11 +202,14 @@ def get_feature_importance(model_name: Optional[str] = None
         else:
             return None
         
-        result = {}
-        for name, imp in zip(feature_cols, importances):
-            result[name] = round(float(imp), 4)
-        
-        return dict(sorted(result.items(), key=lambda x: x[1], reverse=True))
+        # Order in NumPy, then build the result dict once in that order
+        importances = np.asarray(importances, dtype=np.float64).ravel()[:len(feature_cols)]
+        strength = np.round(importances, 4)
+        k = len(strength) if top_k is None else top_k
+        return {
+            feature_cols[i]: round(float(importances[i]), 4)
+            for i in _top_indices(strength, k)
+        }
         
     except Exception as e:
         logger.error(f"Feature importance error: {e}")
@@ -109,44 +219,26 @@ def get_feature_importance(model_name: Optional[str] = None
 def get_lime_explanation(features: pd.DataFrame, model_name: Optional[str] = None,
                          num_features: int = 10) -> Optional[Dict[str, Any]]:
     """Calculate LIME explanation for a single prediction"""
-    if not ensure_models_loaded():
+    inputs = _prepare_explain_inputs(model_name)
+    if inputs is None:
         return None
-    
+    return _lime_from_inputs(features, *inputs, num_features=num_features)
+
+
+def _lime_from_inputs(features: pd.DataFrame, model_name: str, model: Any,
+                      feature_cols: List[str], num_features: int = 10
+                      ) -> Optional[Dict[str, Any]]:
+    """LIME explanation of the last row, given a resolved model"""
     try:
-        if model_name is None:
-            model_name = model_loader.best_model_name
+        X = features[feature_cols]
         
-        model = model_loader.models.get(model_name)
-        if model is None:
-            logger.warning(f"Model {model_name} not found")
-            return None
-        
-        feature_cols = get_feature_names()
-        X = features[feature_cols].copy()
-        
-        # Prepare training data for LIME (use unscaled data - LIME will handle sampling)
-        # LIME needs to sample from the original feature space
-        X_train = X.values
-        
-        # Create LIME explainer with unscaled training data
-        explainer = LimeTabularExplainer(
-            X_train,
-            feature_names=feature_cols,
-            mode='regression',
-            discretize_continuous=True
-        )
+        # LIME samples from the original (unscaled) feature space
+        explainer = _get_lime_explainer(X)
         
         # Get the instance to explain (most recent)
-        instance = X.values[-1:]
+        instance = X.iloc[-1:].to_numpy(dtype=np.float32)
         
-        # Create prediction function that handles scaling
-        def predict_fn(x):
-            """Prediction function for LIME - handles scaling if needed"""
-            if model_loader.scaler:
-                # Scale the input before prediction
-                return model.predict(model_loader.scaler.transform(x))
-            else:
-                return model.predict(x)
+        predict_fn = _scaled_predict_fn(model, model_loader.scaler)
         
         # Get explanation
         explanation = explainer.explain_instance(
@@ -167,7 +259,7 @@ def get_lime_explanation(features: pd.DataFrame, model_name: Optional[str] = Non
         ]
         
         # Get prediction value
-        prediction = model.predict(instance)[0]
+        prediction = predict_fn(instance)[0]
         
         return {
             "model_name": model_name,
@@ -185,9 +277,14 @@ def get_lime_explanation(features: pd.DataFrame, model_name: Optional[str] = Non
 def get_model_explanation_summary(features: pd.DataFrame
                                  ) -> Dict[str, Any]:
     """Get comprehensive model explanation"""
-    shap_data = get_shap_values(features)
-    lime_data = get_lime_explanation(features)
-    importance = get_feature_importance()
+    # Resolve the model once and share it across all three explainers
+    inputs = _prepare_explain_inputs()
+    if inputs is None:
+        return {"error": "Could not generate explanations"}
+    
+    shap_data = _shap_from_inputs(features, *inputs)
+    lime_data = _lime_from_inputs(features, *inputs)
+    importance = _importance_from_model(inputs[1], inputs[2], top_k=5)
     
     if shap_data is None and lime_data is None and importance is None:
         return {"error": "Could not generate explanations"}
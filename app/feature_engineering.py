@@ -1,34 +1,118 @@
 """Feature Engineering - Technical Indicators"""
+import threading
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Tuple
+from collections import OrderedDict
+from scipy.signal import lfilter
+from typing import List, Dict, Any, Optional, Tuple, Union
 from app.config import settings
 
+# Model input columns, in training order
+_FEATURE_NAMES: Tuple[str, ...] = (
+    'returns', 'log_returns', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_width', 'bb_position', 'sma_5', 'sma_10', 'sma_20', 
+    'ema_5', 'ema_10', 'ema_20', 'price_to_sma_20', 'sma_5_to_sma_20',
+    'volatility', 'momentum_10', 'roc_10', 'hour', 'day_of_week', 'is_weekend',
+    'price_lag_1', 'price_lag_2', 'price_lag_3', 'price_lag_5', 'price_lag_10',
+    'returns_lag_1', 'returns_lag_2', 'returns_lag_3', 'returns_lag_5', 'returns_lag_10'
+)
+_FEATURE_INDEX: Dict[str, int] = {name: i for i, name in enumerate(_FEATURE_NAMES)}
+
+# Engineered frames keyed by (last timestamp, length) of the source history
+_FEATURE_CACHE_SIZE = 4
+_feature_cache: "OrderedDict[Tuple[int, int], pd.DataFrame]" = OrderedDict()
+_feature_cache_lock = threading.Lock()
+
+# Pre-dropna frames keyed by (first timestamp, input columns) of the source
+# history. A history that only differs at the tail (live last tick, appended
+# ticks) is recomputed from a short warm-up window instead of from scratch.
+_TAIL_WARMUP = 21  # longest lookback: 20-period rolling std of pct_change
+_FEATURE_STATE_SIZE = 4
+_feature_states: "OrderedDict[Tuple[int, Tuple[str, ...]], _FeatureCache]" = OrderedDict()
+
+
+class _FeatureCache:
+    """Full feature frame for one history plus the MACD EMA state behind it"""
+
+    def __init__(self, timestamps: np.ndarray, prices: np.ndarray, frame: pd.DataFrame,
+                 ema_fast: np.ndarray, ema_slow: np.ndarray):
+        self.timestamps = timestamps
+        self.prices = prices
+        self.frame = frame
+        self.ema_fast = ema_fast
+        self.ema_slow = ema_slow
+
+
+def rolling_mean_std(values: np.ndarray, window: int,
+                     with_std: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Trailing rolling mean and sample std over a float array.
+
+    Matches pandas rolling(window).mean()/.std(): the first window-1 entries
+    (and any window containing NaN) are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan) if with_std else None
+    
+    if window < 1 or len(values) < window:
+        return mean, std
+    
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    mean[window - 1:] = windows.mean(axis=1)
+    if with_std:
+        std[window - 1:] = windows.std(axis=1, ddof=1)
+    return mean, std
+
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """Calculate Relative Strength Index"""
-    delta = prices.diff()
-    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    if len(prices) < period:
+        return pd.Series(np.full(len(prices), np.nan), index=prices.index)
+    
+    # The first delta is undefined and counts as no move, as with Series.where
+    delta = np.diff(prices.to_numpy(dtype=np.float64), prepend=np.nan)
+    gain, _ = rolling_mean_std(np.where(delta > 0, delta, 0.0), period, with_std=False)
+    loss, _ = rolling_mean_std(np.where(delta < 0, -delta, 0.0), period, with_std=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+    return pd.Series(100 - (100 / (1 + rs)), index=prices.index)
+
+
+def _ema_continue(x: np.ndarray, alpha: float, y0: float) -> np.ndarray:
+    """EMA recurrence y[i] = alpha*x[i] + (1-alpha)*y[i-1], starting from state y0"""
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return x.copy()
+    decay = 1.0 - alpha
+    y, _ = lfilter([alpha], [1.0, -decay], x, zi=[decay * y0])
+    return y
+
+
+def _ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """adjust=False EMA seeded with the first value (pandas ewm(adjust=False))"""
+    x = np.asarray(x, dtype=np.float64)
+    return _ema_continue(x, alpha, x[0] if len(x) else 0.0)
+
+
+def _ewm(values: pd.Series, span: int) -> pd.Series:
+    """ewm(span=span, adjust=False).mean() via _ema"""
+    return pd.Series(_ema(values.to_numpy(dtype=np.float64), 2.0 / (span + 1)),
+                     index=values.index)
 
 
 def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, 
                    signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
     """Calculate MACD indicator"""
-    ema_fast = prices.ewm(span=fast, adjust=False).mean()
-    ema_slow = prices.ewm(span=slow, adjust=False).mean()
-    macd = ema_fast - ema_slow
-    sig = macd.ewm(span=signal, adjust=False).mean()
+    macd = _ewm(prices, fast) - _ewm(prices, slow)
+    sig = _ewm(macd, signal)
     return macd, sig, macd - sig
 
 
 def calculate_bollinger_bands(prices: pd.Series, period: int = 20, 
                               std_dev: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
     """Calculate Bollinger Bands"""
-    middle = prices.rolling(window=period).mean()
-    std = prices.rolling(window=period).std()
+    mean, std = rolling_mean_std(prices.to_numpy(), period)
+    middle = pd.Series(mean, index=prices.index)
     upper = middle + std * std_dev
     lower = middle - std * std_dev
     return upper, middle, lower
@@ -40,9 +124,9 @@ def calculate_moving_averages(prices: pd.Series) -> Dict[str, pd.Series]:
         "sma_5": prices.rolling(5).mean(),
         "sma_10": prices.rolling(10).mean(),
         "sma_20": prices.rolling(20).mean(),
-        "ema_5": prices.ewm(span=5, adjust=False).mean(),
-        "ema_10": prices.ewm(span=10, adjust=False).mean(),
-        "ema_20": prices.ewm(span=20, adjust=False).mean()
+        "ema_5": _ewm(prices, 5),
+        "ema_10": _ewm(prices, 10),
+        "ema_20": _ewm(prices, 20)
     }
 
 
@@ -58,76 +142,201 @@ def calculate_momentum(prices: pd.Series, period: int = 10) -> pd.Series:
 
 def calculate_rate_of_change(prices: pd.Series, period: int = 10) -> pd.Series:
     """Calculate rate of change (ROC)"""
-    return ((prices - prices.shift(period)) / prices.shift(period)) * 100
+    shifted = prices.shift(period)
+    return ((prices - shifted) / shifted) * 100
 
 
-def engineer_features(price_history: List[Dict[str, Any]]) -> pd.DataFrame:
-    """Engineer all features from price history"""
-    df = pd.DataFrame(price_history)
+def engineer_features(price_history: Union[List[Dict[str, Any]], pd.DataFrame]
+                      ) -> pd.DataFrame:
+    """Engineer all features from price history (list of dicts or DataFrame)"""
+    if isinstance(price_history, pd.DataFrame):
+        # May be a cached fetcher result - never modify it in place
+        df = price_history.copy()
+    else:
+        df = pd.DataFrame(price_history)
     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     df = df.set_index('timestamp')
-    prices = df['price']
+    return _incremental_feature_frame(df).dropna()
+
+
+def _incremental_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Full feature frame, reusing the cached frame for an unchanged history prefix"""
+    if df.empty:
+        return _build_feature_frame(df)[0]
     
-    # Basic returns
-    df['returns'] = prices.pct_change()
-    df['log_returns'] = np.log(prices / prices.shift(1))
+    periods = settings.PREDICTION_MINUTES // 5
+    timestamps = df.index.asi8.copy()
+    prices = df['price'].to_numpy(dtype=np.float64, copy=True)
+    key = (int(timestamps[0]), tuple(df.columns))
     
-    # Technical indicators
-    df['rsi'] = calculate_rsi(prices, settings.RSI_PERIOD)
+    with _feature_cache_lock:
+        state = _feature_states.get(key)
     
-    macd, signal, hist = calculate_macd(
-        prices, settings.MACD_FAST, settings.MACD_SLOW, settings.MACD_SIGNAL
-    )
-    df['macd'] = macd
-    df['macd_signal'] = signal
-    df['macd_histogram'] = hist
+    frame = None
+    if state is not None:
+        n = min(len(state.timestamps), len(timestamps))
+        differs = (state.timestamps[:n] != timestamps[:n]) | (state.prices[:n] != prices[:n])
+        common = int(np.argmax(differs)) if differs.any() else n
+        
+        if common == len(timestamps) == len(state.timestamps):
+            return state.frame
+        
+        # Rows from `keep` on see changed prices (rolling windows or the
+        # future_price target); recompute them from a slice long enough to
+        # fill every lookback, with the EMAs seeded from the row before it
+        start = common - periods - _TAIL_WARMUP
+        if start >= 1:
+            keep = common - periods
+            seeds = {col: state.frame[col].iat[start - 1]
+                     for col in ('macd_signal', 'ema_5', 'ema_10', 'ema_20')}
+            seeds['ema_fast'] = state.ema_fast[start - 1]
+            seeds['ema_slow'] = state.ema_slow[start - 1]
+            tail, tail_fast, tail_slow = _build_feature_frame(df.iloc[start:].copy(), seeds)
+            offset = keep - start
+            frame = pd.concat([state.frame.iloc[:keep], tail.iloc[offset:]])
+            ema_fast = np.concatenate([state.ema_fast[:keep], tail_fast[offset:]])
+            ema_slow = np.concatenate([state.ema_slow[:keep], tail_slow[offset:]])
     
-    upper, middle, lower = calculate_bollinger_bands(prices)
-    df['bb_upper'] = upper
-    df['bb_middle'] = middle
-    df['bb_lower'] = lower
-    df['bb_width'] = (upper - lower) / middle
-    df['bb_position'] = (prices - lower) / (upper - lower)
+    if frame is None:
+        frame, ema_fast, ema_slow = _build_feature_frame(df)
     
-    # Moving averages
-    for name, values in calculate_moving_averages(prices).items():
-        df[name] = values
+    with _feature_cache_lock:
+        _feature_states[key] = _FeatureCache(timestamps, prices, frame, ema_fast, ema_slow)
+        _feature_states.move_to_end(key)
+        if len(_feature_states) > _FEATURE_STATE_SIZE:
+            _feature_states.popitem(last=False)
+    return frame
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """NaN-padded shift of a float array (pandas Series.shift)"""
+    out = np.full(len(values), np.nan)
+    if abs(periods) >= len(values):
+        # Shifted entirely out of range - all NaN, as pandas returns
+        return out
+    if periods >= 0:
+        out[periods:] = values[:len(values) - periods]
+    else:
+        out[:periods] = values[-periods:]
+    return out
+
+
+def _build_feature_frame(df: pd.DataFrame, seeds: Optional[Dict[str, float]] = None
+                         ) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Add every feature and target column to a timestamp-indexed price frame.
+
+    Indicators are computed on NumPy arrays and joined onto df in one step.
+    Returns the frame before dropna together with the fast/slow MACD EMAs.
+    """
+    seeds = seeds or {}
+    p = df['price'].to_numpy(dtype=np.float64)
     
-    df['price_to_sma_20'] = prices / df['sma_20']
-    df['sma_5_to_sma_20'] = df['sma_5'] / df['sma_20']
+    def ema(values: np.ndarray, span: int, name: str) -> np.ndarray:
+        alpha = 2.0 / (span + 1)
+        seed = seeds.get(name)
+        return _ema(values, alpha) if seed is None else _ema_continue(values, alpha, seed)
     
-    # Volatility & Momentum
-    df['volatility'] = calculate_volatility(prices)
-    df['momentum_10'] = calculate_momentum(prices, 10)
-    df['roc_10'] = calculate_rate_of_change(prices, 10)
+    cols: Dict[str, np.ndarray] = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Basic returns
+        prev = _shift(p, 1)
+        returns = p / prev - 1
+        cols['returns'] = returns
+        cols['log_returns'] = np.log(p / prev)
+        
+        # Technical indicators
+        cols['rsi'] = calculate_rsi(df['price'], settings.RSI_PERIOD).to_numpy()
+        
+        ema_fast = ema(p, settings.MACD_FAST, 'ema_fast')
+        ema_slow = ema(p, settings.MACD_SLOW, 'ema_slow')
+        macd = ema_fast - ema_slow
+        signal = ema(macd, settings.MACD_SIGNAL, 'macd_signal')
+        cols['macd'] = macd
+        cols['macd_signal'] = signal
+        cols['macd_histogram'] = macd - signal
+        
+        middle, std = rolling_mean_std(p, 20)
+        upper = middle + std * 2.0
+        lower = middle - std * 2.0
+        cols['bb_upper'] = upper
+        cols['bb_middle'] = middle
+        cols['bb_lower'] = lower
+        cols['bb_width'] = (upper - lower) / middle
+        cols['bb_position'] = (p - lower) / (upper - lower)
+        
+        # Moving averages
+        for window in (5, 10, 20):
+            cols[f'sma_{window}'] = rolling_mean_std(p, window, with_std=False)[0]
+        for span in (5, 10, 20):
+            cols[f'ema_{span}'] = ema(p, span, f'ema_{span}')
+        
+        cols['price_to_sma_20'] = p / cols['sma_20']
+        cols['sma_5_to_sma_20'] = cols['sma_5'] / cols['sma_20']
+        
+        # Volatility & Momentum
+        cols['volatility'] = rolling_mean_std(returns, 20)[1] * np.sqrt(252)
+        lag_10 = _shift(p, 10)
+        cols['momentum_10'] = p - lag_10
+        cols['roc_10'] = (p - lag_10) / lag_10 * 100
+        
+        # Time features
+        cols['hour'] = df.index.hour.to_numpy()
+        cols['day_of_week'] = df.index.dayofweek.to_numpy()
+        cols['is_weekend'] = (cols['day_of_week'] >= 5).astype(int)
+        
+        # Lag features
+        for lag in [1, 2, 3, 5, 10]:
+            cols[f'price_lag_{lag}'] = prev if lag == 1 else _shift(p, lag)
+            cols[f'returns_lag_{lag}'] = _shift(returns, lag)
+        
+        # Target variables
+        periods = settings.PREDICTION_MINUTES // 5
+        future = _shift(p, -periods)
+        cols['future_price'] = future
+        cols['target_direction'] = (future > p).astype(int)
+        cols['target_return'] = (future - p) / p
     
-    # Time features
-    df['hour'] = df.index.hour
-    df['day_of_week'] = df.index.dayofweek
-    df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+    features = pd.DataFrame(cols, index=df.index)
+    base = df.drop(columns=[c for c in cols if c in df.columns])
+    return pd.concat([base, features], axis=1), ema_fast, ema_slow
+
+
+def engineer_features_cached(price_history: Union[List[Dict[str, Any]], pd.DataFrame]
+                             ) -> pd.DataFrame:
+    """engineer_features, memoised on the history's last timestamp and length.
+
+    The returned frame is shared between callers - do not mutate it.
+    """
+    if len(price_history) == 0:
+        return engineer_features(price_history)
     
-    # Lag features
-    for lag in [1, 2, 3, 5, 10]:
-        df[f'price_lag_{lag}'] = prices.shift(lag)
-        df[f'returns_lag_{lag}'] = df['returns'].shift(lag)
+    if isinstance(price_history, pd.DataFrame):
+        key = (int(price_history["timestamp"].iloc[-1]), len(price_history))
+    else:
+        key = (int(price_history[-1]["timestamp"]), len(price_history))
     
-    # Target variables
-    periods = settings.PREDICTION_MINUTES // 5
-    df['future_price'] = prices.shift(-periods)
-    df['target_direction'] = (df['future_price'] > prices).astype(int)
-    df['target_return'] = (df['future_price'] - prices) / prices
+    with _feature_cache_lock:
+        cached = _feature_cache.get(key)
+        if cached is not None:
+            _feature_cache.move_to_end(key)
+            return cached
     
-    return df.dropna()
+    features = engineer_features(price_history)
+    with _feature_cache_lock:
+        _feature_cache[key] = features
+        if len(_feature_cache) > _FEATURE_CACHE_SIZE:
+            _feature_cache.popitem(last=False)
+    return features
+
+
+def clear_feature_cache():
+    """Drop memoised feature frames"""
+    with _feature_cache_lock:
+        _feature_cache.clear()
+        _feature_states.clear()
 
 
 def get_feature_names() -> List[str]:
     """Get list of feature column names"""
-    return [
-        'returns', 'log_returns', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
-        'bb_width', 'bb_position', 'sma_5', 'sma_10', 'sma_20', 
-        'ema_5', 'ema_10', 'ema_20', 'price_to_sma_20', 'sma_5_to_sma_20',
-        'volatility', 'momentum_10', 'roc_10', 'hour', 'day_of_week', 'is_weekend',
-        'price_lag_1', 'price_lag_2', 'price_lag_3', 'price_lag_5', 'price_lag_10',
-        'returns_lag_1', 'returns_lag_2', 'returns_lag_3', 'returns_lag_5', 'returns_lag_10'
-    ]
+    return list(_FEATURE_NAMES)
 
@@ -1,5 +1,7 @@
 """Model Training - Multiple Model Selection"""
 import logging
+import os
+import pickle
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional
@@ -7,6 +9,8 @@ from typing import Dict, Any, Tuple, Optional
 import numpy as np
 import pandas as pd
 import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
@@ -18,16 +22,20 @@ from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
 from xgboost import XGBRegressor
 
-from app.config import settings
+from app.config import settings, ensure_dirs
 from app.feature_engineering import get_feature_names
 
 logger = logging.getLogger(__name__)
 
+# zlib level 3: several times smaller tree ensembles at little CPU cost
+MODEL_COMPRESSION = ("zlib", 3)
+
 REGRESSION_MODELS = {
     "xgboost": XGBRegressor(
         n_estimators=100,
         max_depth=6,
         learning_rate=0.1,
+        tree_method="hist",
         n_jobs=-1,
         random_state=42
     ),
@@ -55,31 +63,53 @@ def train_regression_models(X: pd.DataFrame, y: pd.Series
     )
     
     scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    # float32 halves the memory traffic; the tree learners bin/split in
+    # float32 internally anyway, so this also saves them a conversion copy
+    X_train_scaled = scaler.fit_transform(X_train).astype(np.float32, copy=False)
+    X_test_scaled = scaler.transform(X_test).astype(np.float32, copy=False)
+    
+    # Fit the models side by side, splitting the cores between them so the
+    # multi-threaded ensembles don't oversubscribe the machine
+    threads = max(1, (os.cpu_count() or 1) // len(REGRESSION_MODELS))
+    jobs = []
+    for name, template in REGRESSION_MODELS.items():
+        model = clone(template)
+        if "n_jobs" in model.get_params():
+            model.set_params(n_jobs=threads)
+        jobs.append(delayed(_fit_regressor)(
+            name, model, X_train_scaled, y_train, X_test_scaled, y_test
+        ))
     
     results = {}
-    
-    for name, model in REGRESSION_MODELS.items():
-        try:
-            model.fit(X_train_scaled, y_train)
-            preds = model.predict(X_test_scaled)
-            
-            metrics = {
-                "rmse": float(np.sqrt(mean_squared_error(y_test, preds))),
-                "mae": float(mean_absolute_error(y_test, preds)),
-                "r2": float(r2_score(y_test, preds))
-            }
-            
-            results[name] = (model, metrics)
-            logger.info(f"{name}: RMSE={metrics['rmse']:.2f}, R2={metrics['r2']:.4f}")
-            
-        except Exception as e:
-            logger.error(f"Training {name} failed: {e}")
+    for name, model, metrics, error in Parallel(n_jobs=len(jobs), prefer="processes")(jobs):
+        if error is not None:
+            logger.error(f"Training {name} failed: {error}")
+            continue
+        results[name] = (model, metrics)
+        logger.info(f"{name}: RMSE={metrics['rmse']:.2f}, R2={metrics['r2']:.4f}")
     
     return results, scaler
 
 
+def _fit_regressor(name: str, model: Any, X_train: np.ndarray, y_train: pd.Series,
+                   X_test: np.ndarray, y_test: pd.Series
+                   ) -> Tuple[str, Any, Optional[Dict[str, float]], Optional[str]]:
+    """Fit one regressor and score it on the test split"""
+    try:
+        model.fit(X_train, y_train)
+        preds = model.predict(X_test)
+        
+        metrics = {
+            "rmse": float(np.sqrt(mean_squared_error(y_test, preds))),
+            "mae": float(mean_absolute_error(y_test, preds)),
+            "r2": float(r2_score(y_test, preds))
+        }
+        return name, model, metrics, None
+        
+    except Exception as e:
+        return name, None, None, str(e)
+
+
 def train_classifier(X: pd.DataFrame, y: pd.Series
                     ) -> Tuple[GradientBoostingClassifier, Dict[str, float]]:
     """Train direction classifier"""
@@ -109,9 +139,9 @@ def train_classifier(X: pd.DataFrame, y: pd.Series
 
 def train_kmeans(X: pd.DataFrame, n_clusters: int = 4) -> Tuple[KMeans, PCA]:
     """Train K-Means for market regime detection"""
-    pca = PCA(n_components=min(5, X.shape[1]))
+    pca = PCA(n_components=min(5, X.shape[1]), svd_solver="randomized", random_state=42)
     X_pca = pca.fit_transform(X)
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=3, algorithm="elkan")
     kmeans.fit(X_pca)
     logger.info(f"K-Means trained with {n_clusters} clusters")
     return kmeans, pca
@@ -137,15 +167,16 @@ def save_models(models: Dict[str, Any], scaler: StandardScaler,
     if version is None:
         version = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    ensure_dirs()
     save_dir = settings.MODEL_DIR / version
     save_dir.mkdir(parents=True, exist_ok=True)
     
     # Save individual models
     for name, model in models.items():
-        joblib.dump(model, save_dir / f"{name}.joblib")
+        _dump(model, save_dir / f"{name}.joblib")
     
     # Save scaler
-    joblib.dump(scaler, save_dir / "scaler.joblib")
+    _dump(scaler, save_dir / "scaler.joblib")
     
     # Save metadata
     metadata = {
@@ -160,15 +191,35 @@ def save_models(models: Dict[str, Any], scaler: StandardScaler,
     return save_dir
 
 
+def _dump(obj: Any, path: Path):
+    """joblib.dump with light compression and the newest pickle protocol"""
+    joblib.dump(obj, path, compress=MODEL_COMPRESSION, protocol=pickle.HIGHEST_PROTOCOL)
+
+
 def promote_to_active(version_dir: Path):
-    """Copy version to active directory"""
+    """Point the active directory at a saved version"""
     import shutil
     
-    # Clear active directory
-    if settings.ACTIVE_MODEL_DIR.exists():
-        shutil.rmtree(settings.ACTIVE_MODEL_DIR)
+    active = settings.ACTIVE_MODEL_DIR
+    # Older installs hold a copied directory; replace it with a link once
+    if active.exists() and not active.is_symlink():
+        shutil.rmtree(active)
+    
+    # Swap a new link into place so readers never see a missing directory
+    tmp = active.with_name(active.name + ".new")
+    try:
+        if tmp.is_symlink():
+            tmp.unlink()
+        tmp.symlink_to(os.path.relpath(version_dir, active.parent), target_is_directory=True)
+        os.replace(tmp, active)
+    except OSError as e:
+        # No symlink support (e.g. unprivileged Windows) - copy as before
+        logger.warning(f"Could not link active models ({e}), copying instead")
+        if tmp.is_symlink():
+            tmp.unlink()
+        if active.is_symlink():
+            active.unlink()
+        shutil.copytree(version_dir, active)
     
-    # Copy new version
-    shutil.copytree(version_dir, settings.ACTIVE_MODEL_DIR)
     logger.info(f"Promoted {version_dir.name} to active")
 
@@ -1,12 +1,21 @@
 """Predictor - Load models and generate predictions with validation"""
+import asyncio
+import atexit
 import logging
-import json
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 import numpy as np
+import orjson
 import pandas as pd
 import joblib
 
@@ -28,19 +37,173 @@ except ImportError:
 
 PREDICTIONS_FILE = Path(settings.BASE_DIR) / "data" / "predictions_history.json"
 PREDICTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Pickled snapshot of the history plus an append-only log of the changes since:
+# one JSON line per new or updated prediction, the last line for a timestamp
+# wins. Once the log grows past a few buffers the snapshot is rewritten from
+# memory and the log starts over.
+PREDICTIONS_SNAPSHOT = PREDICTIONS_FILE.with_suffix(".pkl")
+PREDICTIONS_LOG = PREDICTIONS_FILE.with_suffix(".ndjson")
+_LOG_COMPACT_LINES = 500
+_JSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
 # Prediction history buffer (in-memory, max 50 entries)
 prediction_history: deque = deque(maxlen=50)
+# Guards mutations of prediction_history and the accuracy totals; readers
+# take a deque.copy() under it and iterate the snapshot unlocked
+_history_lock = threading.Lock()
+# Loaded lazily by the first reader/writer rather than at import time, so
+# importing this module (every Streamlit page does) costs no file IO
+_history_loaded = False
+_history_init_lock = threading.Lock()
+
+# Running accuracy totals over prediction_history, kept in step with appends,
+# evictions and validations so get_prediction_accuracy is O(1)
+_validated_count = 0
+_correct_count = 0
+_error_count = 0
+_error_cents = 0  # error amounts are stored rounded to cents; integers don't drift
+
+_log_lock = threading.Lock()
+_log_lines = 0
+
+# Hopsworks sync is debounced: writes mark the history dirty and a background
+# thread (plus an exit hook) pushes it every PREDICTION_SYNC_MINUTES
+_dirty = False
+_sync_thread: Optional[threading.Thread] = None
+# Last price history frame validated against, with its sorted lists
+_validation_lists: Optional[Tuple[pd.DataFrame, List[int], List[float]]] = None
+
+
+# Non-regression artifacts stored alongside the regression models
+_AUX_MODELS = ("classifier", "kmeans", "pca")
+
+
+def _fast_predict(model) -> Callable[[np.ndarray], np.ndarray]:
+    """Predict function for a regressor, going straight to the booster for XGBoost"""
+    get_booster = getattr(model, "get_booster", None)
+    if get_booster is None:
+        return model.predict
+    try:
+        booster = get_booster()
+        missing = getattr(model, "missing", np.nan)
+    except Exception:
+        return model.predict
+    
+    # inplace_predict reads the float32 buffer as-is: no DMatrix, no
+    # feature-name validation or dtype checks from the sklearn wrapper
+    def predict(X: np.ndarray) -> np.ndarray:
+        return booster.inplace_predict(X, missing=missing, validate_features=False)
+    
+    return predict
+
+
+class _ModelSet:
+    """One loaded bundle - models, scaler and metadata plus the lookups derived
+    from them. Never mutated once built, so readers holding it see one version"""
+    
+    def __init__(self, models: Dict[str, Any], scaler: Any = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.models = models
+        self.scaler = scaler
+        self.metadata: Dict[str, Any] = metadata or {}
+        # Indexed once for the prediction hot path
+        self.regression_items: List[Tuple[str, Callable[[np.ndarray], np.ndarray]]] = [
+            (name, _fast_predict(model)) for name, model in models.items() if name not in _AUX_MODELS
+        ]
+        self.classifier = models.get("classifier")
+        self.kmeans = models.get("kmeans")
+        self.pca = models.get("pca")
+        self._regime = self._fuse_regime(self.pca, self.kmeans)
+    
+    @property
+    def best_model_name(self) -> str:
+        return self.metadata.get("best_model", "xgboost")
+    
+    def scale(self, X: np.ndarray) -> np.ndarray:
+        """Apply the fitted scaler to a raw feature matrix"""
+        if self.scaler is None:
+            return X
+        mean = getattr(self.scaler, "mean_", None)
+        scale = getattr(self.scaler, "scale_", None)
+        if mean is None or scale is None:
+            return self.scaler.transform(X)
+        # Same arithmetic as StandardScaler.transform, minus its input checks
+        return (X - mean) / scale
+    
+    @staticmethod
+    def _fuse_regime(pca, kmeans) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """PCA projection and centroids shifted by the PCA mean, for one matmul"""
+        if pca is None or kmeans is None or getattr(pca, "whiten", False):
+            return None
+        try:
+            proj = np.ascontiguousarray(pca.components_.T, dtype=np.float32)
+            centroids = kmeans.cluster_centers_ + pca.mean_ @ pca.components_.T
+            return proj, centroids.astype(np.float32)
+        except Exception as e:
+            logger.warning(f"Could not fuse regime models, using sklearn path: {e}")
+            return None
+    
+    def predict_regime(self, X_scaled: np.ndarray) -> int:
+        """Nearest K-means centroid in PCA space for one scaled row"""
+        if self._regime is None:
+            return int(self.kmeans.predict(self.pca.transform(X_scaled))[0])
+        proj, centroids = self._regime
+        diff = X_scaled[0] @ proj - centroids
+        return int(np.einsum("ij,ij->i", diff, diff).argmin())
 
 
 class ModelLoader:
     """Handles loading and managing trained models"""
     
     def __init__(self):
-        self.models: Dict[str, Any] = {}
-        self.scaler = None
-        self.metadata: Dict[str, Any] = {}
+        self._state = _ModelSet({})
         self._loaded = False
+        self._fingerprint: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.feature_cols: Tuple[str, ...] = tuple(get_feature_names())
+        self._col_idx: Optional[Tuple[pd.Index, np.ndarray]] = None
+    
+    def feature_positions(self, columns: pd.Index) -> np.ndarray:
+        """Positions of the model's feature columns, cached per columns Index"""
+        cached = self._col_idx
+        if cached is not None and cached[0] is columns:
+            return cached[1]
+        idx = columns.get_indexer(self.feature_cols)
+        if (idx < 0).any():
+            missing = [c for c, i in zip(self.feature_cols, idx) if i < 0]
+            raise KeyError(f"Missing feature columns: {missing}")
+        self._col_idx = (columns, idx)
+        return idx
+    
+    @property
+    def state(self) -> _ModelSet:
+        """The current bundle - take it once per prediction so every model,
+        the scaler and the metadata come from the same version"""
+        return self._state
+    
+    @property
+    def models(self) -> Dict[str, Any]:
+        return self._state.models
+    
+    @property
+    def scaler(self):
+        return self._state.scaler
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._state.metadata
+    
+    def install(self, models: Dict[str, Any], scaler: Any = None,
+                metadata: Optional[Dict[str, Any]] = None,
+                fingerprint: Optional[tuple] = None) -> bool:
+        """Swap in a new bundle, built off to the side and published in one
+        assignment; the loader never reports unloaded while a swap is underway"""
+        state = _ModelSet(models, scaler, metadata)
+        with self._lock:
+            self._state = state
+            self._loaded = bool(models)
+            self._fingerprint = fingerprint if self._loaded else None
+        return self._loaded
     
     def load(self, model_dir: Optional[Path] = None) -> bool:
         """Load all models from directory"""
@@ -52,24 +215,29 @@ class ModelLoader:
             return False
         
         try:
-            # Load metadata
-            metadata_path = model_dir / "metadata.joblib"
-            if metadata_path.exists():
-                self.metadata = joblib.load(metadata_path)
+            files = sorted(model_dir.glob("*.joblib"))
+            # Same directory (through the active symlink) and same file stamps:
+            # what is in memory is already current
+            fingerprint = (
+                str(model_dir.resolve()),
+                tuple((f.name, f.stat().st_mtime_ns) for f in files),
+            )
+            if self._loaded and fingerprint == self._fingerprint:
+                logger.debug(f"Models in {model_dir} unchanged, skipping reload")
+                return True
             
-            # Load scaler
-            scaler_path = model_dir / "scaler.joblib"
-            if scaler_path.exists():
-                self.scaler = joblib.load(scaler_path)
+            # Unpickling is mostly decompression and numpy buffer copies, which
+            # release the GIL - load the artifacts side by side
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(files)))) as pool:
+                loaded = dict(zip((f.stem for f in files), pool.map(joblib.load, files)))
             
-            # Load all models
-            for model_file in model_dir.glob("*.joblib"):
-                if model_file.stem not in ["metadata", "scaler"]:
-                    self.models[model_file.stem] = joblib.load(model_file)
+            # Scaler and metadata carry over when the directory has none
+            metadata = loaded.pop("metadata", self.metadata)
+            scaler = loaded.pop("scaler", self.scaler)
             
-            self._loaded = bool(self.models)
-            logger.info(f"Loaded {len(self.models)} models from {model_dir}")
-            return self._loaded
+            ok = self.install(loaded, scaler, metadata, fingerprint)
+            logger.info(f"Loaded {len(loaded)} models from {model_dir}")
+            return ok
             
         except Exception as e:
             logger.error(f"Failed to load models: {e}")
@@ -81,11 +249,14 @@ class ModelLoader:
     
     @property
     def best_model_name(self) -> str:
-        return self.metadata.get("best_model", "xgboost")
+        return self._state.best_model_name
 
 
 # Global model loader
 model_loader = ModelLoader()
+# One cold load at a time - concurrent first requests wait for it instead of
+# each starting their own local/Hopsworks load
+_models_load_lock = threading.Lock()
 
 
 def ensure_models_loaded() -> bool:
@@ -93,6 +264,14 @@ def ensure_models_loaded() -> bool:
     if model_loader.is_loaded:
         return True
     
+    with _models_load_lock:
+        if model_loader.is_loaded:
+            return True
+        return _load_models_cold()
+
+
+def _load_models_cold() -> bool:
+    """Local models first, then the Hopsworks registry"""
     if model_loader.load():
         return True
     logger.info("Local models not found, attempting to load from Hopsworks...")
@@ -101,12 +280,9 @@ def ensure_models_loaded() -> bool:
         
         hw_model_data = get_latest_model()
         if hw_model_data and hw_model_data.get("models"):
-            model_loader.models = hw_model_data.get("models", {})
-            model_loader.scaler = hw_model_data.get("scaler")
-            model_loader.metadata = hw_model_data.get("metadata", {})
-            model_loader._loaded = bool(model_loader.models)
-            
-            if model_loader._loaded:
+            if model_loader.install(hw_model_data.get("models", {}),
+                                    hw_model_data.get("scaler"),
+                                    hw_model_data.get("metadata", {})):
                 logger.info(f"Loaded {len(model_loader.models)} models from Hopsworks Model Registry")
                 return True
     except Exception as e:
@@ -116,48 +292,64 @@ def ensure_models_loaded() -> bool:
     return False
 
 
-def generate_prediction(features: pd.DataFrame, current_price: float
-                       ) -> Optional[Dict[str, Any]]:
-    """Generate predictions using all models"""
+def generate_prediction(features: pd.DataFrame, current_price: float,
+                        all_models: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """Generate a prediction with the best model, or every model if all_models
+    (default: settings.PREDICT_ALL_MODELS)"""
     if not ensure_models_loaded():
         logger.warning("Models not loaded, cannot predict")
         return None
     
     try:
-        feature_cols = get_feature_names()
-        X = features[feature_cols].iloc[-1:].copy()
-        
-        if model_loader.scaler:
-            X_scaled = model_loader.scaler.transform(X)
-        else:
-            X_scaled = X.values
+        # Only the latest row is predicted on - project just that row by
+        # position, and reuse the one scaled float32 buffer for every model below
+        # One bundle for the whole prediction, even if a reload swaps mid-way
+        state = model_loader.state
+        idx = model_loader.feature_positions(features.columns)
+        X = features.iloc[-1:, idx].to_numpy(dtype=np.float32)
+        X_scaled = np.ascontiguousarray(state.scale(X), dtype=np.float32)
         
         predictions = {}
-        best_model = model_loader.best_model_name
+        best_model = state.best_model_name
+        if all_models is None:
+            all_models = settings.PREDICT_ALL_MODELS
         
-        for name, model in model_loader.models.items():
-            if name in ["classifier", "kmeans", "pca"]:
-                continue
+        items = state.regression_items
+        if not all_models:
+            # Best model only - the others just stand in if it fails
+            items = sorted(items, key=lambda item: item[0] != best_model)
+        for name, predict in items:
             try:
-                pred = float(model.predict(X_scaled)[0])
+                pred = float(predict(X_scaled)[0])
                 predictions[name] = pred
             except Exception as e:
                 logger.error(f"Prediction error for {name}: {e}")
+                continue
+            if not all_models:
+                break
         
         if not predictions:
             return None
         
-        predicted_price = predictions.get(best_model, list(predictions.values())[0])
+        predicted_price = predictions.get(best_model)
+        if predicted_price is None:
+            predicted_price = next(iter(predictions.values()))
         
-        direction = "up" if predicted_price > current_price else "down"
-        price_diff_pct = abs(predicted_price - current_price) / current_price * 100
-        confidence = min(95, 50 + price_diff_pct * 10)
-        if "classifier" in model_loader.models:
+        # Every derived figure comes from this one difference
+        price_change = predicted_price - current_price
+        price_change_pct = price_change / current_price * 100
+        direction = "up" if price_change > 0 else "down"
+        confidence = min(95, 50 + abs(price_change_pct) * 10)
+        classifier = state.classifier
+        if classifier is not None:
             try:
-                classifier_pred = model_loader.models["classifier"].predict(X_scaled)[0]
+                # predict() is the most probable class - read it off the
+                # probabilities rather than running the ensemble twice
+                proba = classifier.predict_proba(X_scaled)[0]
+                best = int(proba[1] >= proba[0]) if len(proba) == 2 else int(proba.argmax())
+                classifier_pred = classifier.classes_[best]
                 classifier_direction = "up" if classifier_pred == 1 else "down"
-                direction_proba = model_loader.models["classifier"].predict_proba(X_scaled)
-                classifier_confidence = float(max(direction_proba[0])) * 100
+                classifier_confidence = float(proba[best]) * 100
                 
                 if classifier_direction != direction:
                     logger.warning(
@@ -172,9 +364,8 @@ def generate_prediction(features: pd.DataFrame, current_price: float
                 logger.warning(f"Classifier prediction failed: {e}, using price-based direction")
         
         regime = "neutral"
-        if "kmeans" in model_loader.models and "pca" in model_loader.models:
-            X_pca = model_loader.models["pca"].transform(X_scaled)
-            cluster = model_loader.models["kmeans"].predict(X_pca)[0]
+        if state.kmeans is not None and state.pca is not None:
+            cluster = state.predict_regime(X_scaled)
             regimes = ["accumulation", "uptrend", "distribution", "downtrend"]
             regime = regimes[cluster % len(regimes)]
         
@@ -189,8 +380,8 @@ def generate_prediction(features: pd.DataFrame, current_price: float
             "predicted_price": round(predicted_price, 2),
             "predicted_direction": direction,
             "confidence": round(confidence, 1),
-            "price_change": round(predicted_price - current_price, 2),
-            "price_change_pct": round((predicted_price - current_price) / current_price * 100, 2),
+            "price_change": round(price_change, 2),
+            "price_change_pct": round(price_change_pct, 2),
             "market_regime": regime,
             "model_used": best_model,
             "all_predictions": {k: round(v, 2) for k, v in predictions.items()},
@@ -207,175 +398,440 @@ def generate_prediction(features: pd.DataFrame, current_price: float
         return None
 
 
+class PredictionBatcher:
+    """Coalesce concurrent prediction requests into a single model pass.
+
+    Requests arriving within max_latency_ms of the first one (or until
+    max_batch_size is reached) share one generate_prediction call. Only one
+    symbol is tracked and inputs come from the same cached price fetch, so a
+    batch collapses to a single row - the freshest request's inputs are used.
+    """
+    
+    def __init__(self, max_batch_size: int = 16, max_latency_ms: float = 20):
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self._pending: List[asyncio.Future] = []
+        self._inputs = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    async def predict(self, features: pd.DataFrame, current_price: float
+                     ) -> Optional[Dict[str, Any]]:
+        """Queue a prediction request and wait for its batch to run"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(future)
+        self._inputs = (features, current_price)
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Run one prediction for everything queued so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(asyncio.to_thread(generate_prediction, *self._inputs))
+        self._inputs = None
+        
+        def _resolve(done: asyncio.Future):
+            # A cancelled task (e.g. loop shutdown) has no exception to read -
+            # cancel the waiters rather than leave them pending forever
+            cancelled = done.cancelled()
+            error = None if cancelled else done.exception()
+            for future in batch:
+                if future.done():
+                    continue
+                if cancelled:
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result())
+        
+        task.add_done_callback(_resolve)
+
+
+prediction_batcher = PredictionBatcher()
+
+
 def _store_prediction(prediction: Dict[str, Any]):
     """Store prediction in history"""
     entry = {
         **prediction,
+        "timestamp_ms": prediction["target_timestamp_ms"] - settings.PREDICTION_MINUTES * 60_000,
         "actual_price": None,
         "was_correct": None,
         "error_amount": None,
         "validated_at": None
     }
-    prediction_history.append(entry)
-    _save_predictions_to_file()
+    _ensure_history_loaded()
+    with _history_lock:
+        if len(prediction_history) == prediction_history.maxlen:
+            _count_validation(prediction_history[0], -1)
+        prediction_history.append(entry)
+    _append_to_log([entry])
+
+
+def _count_validation(entry: Dict[str, Any], sign: int = 1):
+    """Add (or with sign=-1 remove) a validated entry from the accuracy totals"""
+    global _validated_count, _correct_count, _error_count, _error_cents
+    if entry.get("was_correct") is None:
+        return
+    _validated_count += sign
+    if entry["was_correct"]:
+        _correct_count += sign
+    if entry.get("error_amount"):
+        _error_count += sign
+        _error_cents += sign * round(entry["error_amount"] * 100)
+
 
+def _snapshot_history() -> deque:
+    """Consistent copy of the history, safe to iterate while others append"""
+    with _history_lock:
+        return prediction_history.copy()
 
-def _save_predictions_to_file():
-    """Save predictions to JSON file and sync to Hopsworks"""
+
+def _recount_validations():
+    """Rebuild the accuracy totals after the history is replaced (caller holds _history_lock)"""
+    global _validated_count, _correct_count, _error_count, _error_cents
+    _validated_count = _correct_count = _error_count = _error_cents = 0
+    for entry in prediction_history:
+        _count_validation(entry)
+
+
+def _dump_line(entry: Dict[str, Any]) -> bytes:
+    """One compact NDJSON line for a prediction entry"""
+    return orjson.dumps(entry, default=str, option=_JSON_OPTIONS)
+
+
+def _append_to_log(entries: List[Dict[str, Any]]):
+    """Append new/updated predictions to the local log and schedule a sync"""
+    global _log_lines
     try:
-        data = list(prediction_history)
-        with open(PREDICTIONS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        with _log_lock:
+            if _log_lines + len(entries) > _LOG_COMPACT_LINES:
+                _rewrite_log()
+            else:
+                with open(PREDICTIONS_LOG, 'ab') as f:
+                    f.writelines(_dump_line(e) for e in entries)
+                _log_lines += len(entries)
     except Exception as e:
         logger.error(f"Failed to save predictions to file: {e}")
     
+    _mark_dirty()
+
+
+def _rewrite_log():
+    """Snapshot the current history and empty the log (caller holds _log_lock)"""
+    global _log_lines
+    tmp = PREDICTIONS_SNAPSHOT.with_suffix(".pkl.tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump(list(_snapshot_history()), f, protocol=5)
+    os.replace(tmp, PREDICTIONS_SNAPSHOT)
+    # Replaying the old log over the new snapshot is harmless, so a crash
+    # before the truncate loses nothing
+    open(PREDICTIONS_LOG, 'wb').close()
+    _log_lines = 0
+
+
+def _entry_key(entry: Dict[str, Any]) -> Any:
+    """Identity of a prediction across the snapshot and log lines"""
+    # Logged timestamps are stringified, snapshot ones may still be datetimes
+    return entry.get("timestamp_ms") or str(entry.get("timestamp"))
+
+
+def _read_log() -> List[Dict[str, Any]]:
+    """Latest version of each stored prediction, oldest first"""
+    global _log_lines
+    if not PREDICTIONS_LOG.exists() and not PREDICTIONS_SNAPSHOT.exists():
+        # Older installs keep the whole history in one JSON document
+        if PREDICTIONS_FILE.exists():
+            return orjson.loads(PREDICTIONS_FILE.read_bytes())
+        return []
+    
+    # Updates keep the position of the original prediction
+    entries: Dict[Any, Dict[str, Any]] = {}
+    if PREDICTIONS_SNAPSHOT.exists():
+        with open(PREDICTIONS_SNAPSHOT, 'rb') as f:
+            for entry in pickle.load(f):
+                entries[_entry_key(entry)] = entry
+    
+    lines = 0
+    if PREDICTIONS_LOG.exists():
+        with open(PREDICTIONS_LOG, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    entry = orjson.loads(line)
+                    entries[_entry_key(entry)] = entry
+                    lines += 1
+    _log_lines = lines
+    return list(entries.values())
+
+
+def _backfill_timestamps(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Give older/Hopsworks entries the epoch-ms stamps new entries carry"""
+    horizon_ms = settings.PREDICTION_MINUTES * 60_000
+    for entry in entries:
+        # Hopsworks rows come back as pd.Timestamp - keep the ISO strings local
+        # entries carry, which the rest of the module slices and compares
+        for key in ("timestamp", "target_timestamp"):
+            value = entry.get(key)
+            if isinstance(value, datetime):
+                entry[key] = value.isoformat()
+        if entry.get("target_timestamp_ms") and entry.get("timestamp_ms"):
+            continue
+        ts = entry.get("timestamp")
+        try:
+            if isinstance(ts, datetime):
+                pred_time = ts
+            else:
+                pred_time = datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
+            pred_time = pred_time.replace(tzinfo=None) if pred_time.tzinfo else pred_time
+            timestamp_ms = int(pred_time.timestamp() * 1000)
+        except (ValueError, TypeError):
+            continue
+        entry.setdefault("timestamp_ms", timestamp_ms)
+        if not entry.get("target_timestamp_ms"):
+            entry["target_timestamp_ms"] = timestamp_ms + horizon_ms
+    return entries
+
+
+def _mark_dirty():
+    """Flag the history for the next Hopsworks sync"""
+    global _dirty, _sync_thread
+    _dirty = True
+    if _sync_thread is None:
+        _sync_thread = threading.Thread(target=_sync_loop, daemon=True)
+        _sync_thread.start()
+        atexit.register(flush_predictions_to_hopsworks)
+
+
+def _sync_loop():
+    """Periodically push pending predictions to Hopsworks"""
+    while True:
+        time.sleep(settings.PREDICTION_SYNC_MINUTES * 60)
+        flush_predictions_to_hopsworks()
+
+
+def flush_predictions_to_hopsworks():
+    """Sync predictions to Hopsworks if anything changed since the last sync"""
+    global _dirty
+    if not _dirty:
+        return
+    _dirty = False
+    
     try:
         from storage.prediction_store import sync_predictions_to_hopsworks
-        sync_predictions_to_hopsworks(list(prediction_history))
+        sync_predictions_to_hopsworks(list(_snapshot_history()))
     except Exception as e:
+        _dirty = True
         logger.warning(f"Failed to sync predictions to Hopsworks: {e}")
 
 
 def _load_predictions_from_file():
     """Load predictions from JSON file and Hopsworks on startup"""
-    global prediction_history
+    global prediction_history, _history_loaded
     
-    prediction_history.clear()
+    # A full (re)load supersedes the lazy local one
+    with _history_init_lock:
+        _history_loaded = True
     
-    loaded_from_hopsworks = False
+    # Read first and swap in one step, so readers never see a half-empty history
+    entries = None
     try:
         from storage.prediction_store import fetch_predictions_from_hopsworks
         hopsworks_predictions = fetch_predictions_from_hopsworks(limit=50)
         if hopsworks_predictions:
-            prediction_history.extend(hopsworks_predictions)
+            entries = _backfill_timestamps(hopsworks_predictions)
             logger.info(f"Loaded {len(hopsworks_predictions)} predictions from Hopsworks")
-            loaded_from_hopsworks = True
     except Exception as e:
         logger.warning(f"Could not load predictions from Hopsworks: {e}")
     
+    loaded_from_hopsworks = entries is not None
     if not loaded_from_hopsworks:
-        try:
-            if PREDICTIONS_FILE.exists():
-                with open(PREDICTIONS_FILE, 'r') as f:
-                    data = json.load(f)
-                    prediction_history.extend(data[-50:])
-                logger.info(f"Loaded {len(data)} predictions from local file")
-        except Exception as e:
-            logger.error(f"Failed to load predictions from file: {e}")
+        entries = _read_local_history()
+    
+    with _history_lock:
+        prediction_history.clear()
+        prediction_history.extend(entries)
+        _recount_validations()
+    
+    if loaded_from_hopsworks:
+        # Keep the local log in line with what is now in memory
+        with _log_lock:
+            _rewrite_log()
+
+
+def _read_local_history() -> List[Dict[str, Any]]:
+    """Latest entries from the local snapshot and log"""
+    try:
+        data = _read_log()
+        logger.info(f"Loaded {len(data)} predictions from local file")
+        return _backfill_timestamps(data[-50:])
+    except Exception as e:
+        logger.error(f"Failed to load predictions from file: {e}")
+        return []
+
+
+def _load_local_history():
+    """Fill the (empty) history from the local snapshot and log"""
+    entries = _read_local_history()
+    with _history_lock:
+        prediction_history.extend(entries)
+        _recount_validations()
+
+
+def _ensure_history_loaded():
+    """Load the local history once per process, on first use"""
+    global _history_loaded
+    if _history_loaded:
+        return
+    with _history_init_lock:
+        if not _history_loaded:
+            _load_local_history()
+            _history_loaded = True
+
+
+def _validation_prices(history: pd.DataFrame) -> Tuple[List[int], List[float]]:
+    """Sorted timestamp/price lists for a price history frame.
+
+    The fetcher hands out the same cached frame until its TTL expires, so the
+    lists are rebuilt only when a new frame arrives.
+    """
+    global _validation_lists
+    cached = _validation_lists
+    if cached is not None and cached[0] is history:
+        return cached[1], cached[2]
+    
+    ordered = history.sort_values("timestamp")
+    hist_ts = ordered["timestamp"].to_numpy(dtype=np.int64).tolist()
+    hist_prices = ordered["price"].to_numpy(dtype=np.float64).tolist()
+    _validation_lists = (history, hist_ts, hist_prices)
+    return hist_ts, hist_prices
 
 
 def validate_predictions(current_price: float = None):
     """Validate past predictions by checking if we have data for their target time"""
-    from app.data_fetcher import fetch_price_history
+    from app.data_fetcher import fetch_price_history_df
     
     tolerance_pct = settings.DIRECTION_TOLERANCE_PCT
+    tolerance_ms = 5 * 60 * 1000
     now = datetime.now()
+    now_ms = int(now.timestamp() * 1000)
     
-    # Fetch recent price history to check target times
+    # Fetch recent price history to check target times, sorted once into plain
+    # lists so each lookup is a bisect without numpy scalar overhead
     try:
         history_hours = max(2, settings.PREDICTION_MINUTES / 60 + 1)
-        price_history = fetch_price_history(hours=int(history_hours))
-        price_dict = {p["timestamp"]: p["price"] for p in price_history}
+        hist_ts, hist_prices = _validation_prices(fetch_price_history_df(hours=int(history_hours)))
     except Exception as e:
         logger.warning(f"Could not fetch price history for validation: {e}")
         if current_price is None:
             return
-        price_dict = {}
+        hist_ts = []
+        hist_prices = []
     
-    for entry in prediction_history:
+    # Work on a snapshot so new predictions can be stored meanwhile; results
+    # are applied under the lock at the end
+    _ensure_history_loaded()
+    validated = []
+    for entry in _snapshot_history():
         if entry["was_correct"] is not None:
             continue
         
+        # Stamped at store time, or backfilled when the history was loaded
         target_timestamp_ms = entry.get("target_timestamp_ms")
         if not target_timestamp_ms:
-            try:
-                pred_time = datetime.fromisoformat(entry["timestamp"].replace('Z', '+00:00'))
-            except (ValueError, AttributeError):
-                try:
-                    pred_time = datetime.fromisoformat(entry["timestamp"])
-                except:
-                    continue
-            pred_time = pred_time.replace(tzinfo=None) if pred_time.tzinfo else pred_time
-            target_time = pred_time + timedelta(minutes=settings.PREDICTION_MINUTES)
-            target_timestamp_ms = int(target_time.timestamp() * 1000)
+            continue
         
+        # Nearest history point to the target time, if within tolerance
         actual_price = None
-        for hist_ts, hist_price in price_dict.items():
-            time_diff_ms = abs(hist_ts - target_timestamp_ms)
-            if time_diff_ms <= 5 * 60 * 1000:
-                actual_price = hist_price
-                break
+        pos = bisect_left(hist_ts, target_timestamp_ms)
+        nearest = [i for i in (pos - 1, pos) if 0 <= i < len(hist_ts)]
+        if nearest:
+            best = min(nearest, key=lambda i: abs(hist_ts[i] - target_timestamp_ms))
+            if abs(hist_ts[best] - target_timestamp_ms) <= tolerance_ms:
+                actual_price = hist_prices[best]
         
         if actual_price is None:
-            target_time = datetime.fromtimestamp(target_timestamp_ms / 1000)
-            if now >= target_time:
-                if current_price is not None:
-                    actual_price = current_price
-                else:
-                    continue
+            if now_ms >= target_timestamp_ms and current_price is not None:
+                actual_price = current_price
             else:
                 continue
         
-        entry["actual_price"] = round(actual_price, 2)
-        entry["validated_at"] = now.isoformat()
-        
         price_at_prediction = entry["current_price"]
         predicted_direction = entry["predicted_direction"]
         predicted_price = entry["predicted_price"]
         actual_change = actual_price - price_at_prediction
         actual_change_pct = abs(actual_change / price_at_prediction * 100)
         
-        entry["error_amount"] = round(abs(predicted_price - actual_price), 2)
+        result = {
+            "actual_price": round(actual_price, 2),
+            "validated_at": now.isoformat(),
+            "error_amount": round(abs(predicted_price - actual_price), 2),
+        }
         
         if actual_change_pct < tolerance_pct:
-            entry["was_correct"] = False
-            entry["validation_note"] = "price_within_tolerance"
+            result["was_correct"] = False
+            result["validation_note"] = "price_within_tolerance"
         else:
             actual_direction = "up" if actual_change > 0 else "down"
-            entry["was_correct"] = (actual_direction == predicted_direction)
-            entry["validation_note"] = "direction_validated"
+            result["was_correct"] = (actual_direction == predicted_direction)
+            result["validation_note"] = "direction_validated"
+        validated.append((entry, result))
         
         logger.info(
             f"Validated prediction from {entry['timestamp'][:19]}: "
             f"predicted={predicted_direction} to ${predicted_price:,.2f}, "
             f"actual at target time=${actual_price:,.2f}, "
-            f"change={actual_change_pct:.2f}%, correct={entry['was_correct']}"
+            f"change={actual_change_pct:.2f}%, correct={result['was_correct']}"
         )
     
-    _save_predictions_to_file()
+    if not validated:
+        return
+    
+    with _history_lock:
+        # Entries evicted (or replaced by a history reload) since the snapshot
+        # no longer count towards accuracy, and must not be logged back in
+        live = {id(e) for e in prediction_history}
+        kept = []
+        for entry, result in validated:
+            entry.update(result)
+            if id(entry) in live:
+                _count_validation(entry)
+                kept.append(entry)
+    if kept:
+        _append_to_log(kept)
 
 
-def get_prediction_history() -> List[Dict[str, Any]]:
-    """Get prediction history as list"""
-    return list(prediction_history)
+def get_prediction_history(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get prediction history as list, optionally only the latest `limit` entries"""
+    _ensure_history_loaded()
+    snapshot = _snapshot_history()
+    if limit is None:
+        return list(snapshot)
+    return list(islice(reversed(snapshot), limit))[::-1]
 
 
 def get_prediction_accuracy() -> Dict[str, Any]:
     """Calculate prediction accuracy statistics"""
-    validated = [p for p in prediction_history if p["was_correct"] is not None]
-    
-    if not validated:
+    _ensure_history_loaded()
+    if not _validated_count:
         return {"accuracy": 0, "total_predictions": 0, "validated_count": 0}
     
-    correct = sum(1 for p in validated if p["was_correct"])
-    
     return {
-        "accuracy": round(correct / len(validated) * 100, 1),
+        "accuracy": round(_correct_count / _validated_count * 100, 1),
         "total_predictions": len(prediction_history),
-        "validated_count": len(validated),
-        "correct_count": correct,
-        "avg_error": round(
-            np.mean([p["error_amount"] for p in validated if p["error_amount"]]), 2
-        )
+        "validated_count": _validated_count,
+        "correct_count": _correct_count,
+        "avg_error": round(_error_cents / _error_count / 100, 2) if _error_count else float("nan")
     }
-
-
-# Load predictions from file on module initialization
-try:
-    if PREDICTIONS_FILE.exists():
-        with open(PREDICTIONS_FILE, 'r') as f:
-            data = json.load(f)
-            prediction_history.extend(data[-50:])
-        logger.info(f"Loaded {len(data)} predictions from file on startup")
-except Exception as e:
-    logger.error(f"Failed to load predictions on startup: {e}")
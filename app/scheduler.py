@@ -1,8 +1,11 @@
 """Background scheduler for pipelines in Streamlit"""
+import asyncio
 import threading
-import time
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -12,6 +15,38 @@ _scheduler_running = False
 _last_feature_run = None
 _last_training_run = None
 _last_inference_run = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_stop_async: Optional[asyncio.Event] = None
+# Guards publishing/clearing _loop and _stop_async, so a scheduler thread that
+# is shutting down cannot wipe the references of one started after it
+_loop_lock = threading.Lock()
+# Feature and training runs both write the feature store: they share one
+# thread and run one at a time in submission order. Inference has its own
+_store_executor: Optional[ThreadPoolExecutor] = None
+_inference_executor: Optional[ThreadPoolExecutor] = None
+# Registry version of the bundle last swapped in by _reload_models
+_last_model_version: Optional[int] = None
+
+
+@lru_cache(maxsize=None)
+def _feature_fn():
+    """Feature pipeline flow, imported once"""
+    from pipelines.feature_pipeline import feature_pipeline
+    return feature_pipeline
+
+
+@lru_cache(maxsize=None)
+def _training_fn():
+    """Training pipeline flow, imported once"""
+    from pipelines.training_pipeline import training_pipeline
+    return training_pipeline
+
+
+@lru_cache(maxsize=None)
+def _inference_fn():
+    """Inference pipeline flow, imported once"""
+    from pipelines.inference_pipeline import inference_pipeline
+    return inference_pipeline
 
 
 def _run_feature_pipeline():
@@ -19,26 +54,31 @@ def _run_feature_pipeline():
     global _last_feature_run
     try:
         logger.info("Running scheduled feature pipeline")
-        from pipelines.feature_pipeline import feature_pipeline
-        result = feature_pipeline()
+        result = _feature_fn()()
         _last_feature_run = datetime.now()
         logger.info(f"Feature pipeline complete: {result.get('success', False)}")
     except Exception as e:
         logger.error(f"Feature pipeline error: {e}")
 
 
-def _run_training_pipeline():
+def _run_training_pipeline() -> bool:
     """Run training pipeline"""
     global _last_training_run
     try:
         logger.info("Running scheduled training pipeline")
-        from pipelines.training_pipeline import training_pipeline
-        result = training_pipeline()
+        result = _training_fn()()
         _last_training_run = datetime.now()
         logger.info(f"Training pipeline complete: Best model = {result.get('best_model', 'N/A')}")
-        _reload_models()
+        return True
     except Exception as e:
         logger.error(f"Training pipeline error: {e}")
+        return False
+
+
+def _on_training_done(future: Future):
+    """Pick up the new models once a training run succeeded"""
+    if not future.cancelled() and future.result():
+        _reload_models()
 
 
 def _run_inference_pipeline():
@@ -46,8 +86,7 @@ def _run_inference_pipeline():
     global _last_inference_run
     try:
         logger.info("Running scheduled inference pipeline")
-        from pipelines.inference_pipeline import inference_pipeline
-        result = inference_pipeline()
+        result = _inference_fn()()
         _last_inference_run = datetime.now()
         logger.info(f"Inference pipeline complete: {result.get('success', False)}")
     except Exception as e:
@@ -55,72 +94,140 @@ def _run_inference_pipeline():
 
 
 def _reload_models():
-    """Force reload models from Hopsworks after training"""
+    """Pick up the models and the cleared prediction history after training"""
+    global _last_model_version
     try:
-        logger.info("Reloading models and predictions after training")
-        from app.predictor import model_loader, _load_predictions_from_file
-        model_loader._loaded = False
-        from storage.model_registry import get_latest_model
-        hw_model_data = get_latest_model()
-        if hw_model_data and hw_model_data.get("models"):
-            model_loader.models = hw_model_data.get("models", {})
-            model_loader.scaler = hw_model_data.get("scaler")
-            model_loader.metadata = hw_model_data.get("metadata", {})
-            model_loader._loaded = True
-            logger.info(f"Reloaded {len(model_loader.models)} models from Hopsworks")
-            _load_predictions_from_file()
-            logger.info("Reloaded prediction history (cleared old predictions)")
+        from app.predictor import model_loader
+        from storage.model_registry import get_latest_model, get_latest_model_version
+        
+        # Retrains often leave the registry on the same version - no models to swap
+        version = get_latest_model_version()
+        if version is not None and version == _last_model_version and model_loader.is_loaded:
+            logger.info(f"Model bundle still at v{version}, skipping model reload")
+        else:
+            logger.info("Reloading models after training")
+            hw_model_data = get_latest_model()
+            if hw_model_data and hw_model_data.get("models"):
+                # Swapped in whole - predictions in flight keep the bundle they started with
+                model_loader.install(hw_model_data.get("models", {}),
+                                     hw_model_data.get("scaler"),
+                                     hw_model_data.get("metadata", {}))
+                _last_model_version = hw_model_data.get("version")
+                logger.info(f"Reloaded {len(model_loader.models)} models from Hopsworks")
     except Exception as e:
         logger.error(f"Model reload error: {e}")
+    
+    # Training clears the stored prediction history whether or not a new
+    # bundle was registered - drop the old predictions from memory too
+    try:
+        from app.predictor import _load_predictions_from_file
+        _load_predictions_from_file()
+        logger.info("Reloaded prediction history (cleared old predictions)")
+    except Exception as e:
+        logger.error(f"Prediction history reload error: {e}")
+
 
+def _release_loop(loop: asyncio.AbstractEventLoop):
+    """Forget loop's references unless a newer scheduler has replaced them"""
+    global _loop, _stop_async
+    with _loop_lock:
+        if _loop is loop:
+            _loop = _stop_async = None
 
-def _scheduler_loop():
-    """Main scheduler loop"""
-    global _scheduler_running, _last_feature_run, _last_training_run, _last_inference_run
+
+async def _scheduler_async(executors: Dict[str, ThreadPoolExecutor]):
+    """Run each pipeline on its own call_later chain until stopped"""
+    global _loop, _stop_async
     
-    feature_interval = settings.PREDICTION_REFRESH_MINUTES * 60
+    # Features and inference refresh on the same cadence
+    refresh_interval = settings.PREDICTION_REFRESH_MINUTES * 60
     training_interval = settings.TRAINING_INTERVAL_MINUTES * 60
-    inference_interval = settings.PREDICTION_REFRESH_MINUTES * 60
-    
-    last_feature_time = 0
-    last_training_time = 0
-    last_inference_time = 0
     
     logger.info("Background scheduler started")
     logger.info(f"Feature pipeline: every {settings.PREDICTION_REFRESH_MINUTES} minutes")
     logger.info(f"Training pipeline: every {settings.TRAINING_INTERVAL_MINUTES} minutes")
     logger.info(f"Inference pipeline: every {settings.PREDICTION_REFRESH_MINUTES} minutes")
     
-    _run_inference_pipeline()
-    last_inference_time = time.time()
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    with _loop_lock:
+        # Stopped - or stopped and restarted - before this thread got going
+        current = _scheduler_running and executors["store"] is _store_executor
+        if current:
+            _loop, _stop_async = loop, stop
+    if not current:
+        return
     
-    while _scheduler_running:
-        current_time = time.time()
-        
-        if current_time - last_feature_time >= feature_interval:
-            _run_feature_pipeline()
-            last_feature_time = current_time
-        
-        if current_time - last_training_time >= training_interval:
-            _run_training_pipeline()
-            last_training_time = current_time
-        
-        if current_time - last_inference_time >= inference_interval:
-            _run_inference_pipeline()
-            last_inference_time = current_time
-        
-        time.sleep(30)
+    # Inference runs beside the store lane (a long training run no longer
+    # holds it up); each pipeline still has at most one run in flight
+    running: Dict[str, Future] = {}
+    timers: Dict[str, asyncio.TimerHandle] = {}
+    
+    def submit(name: str, lane: str, job: Callable[[], Any],
+               on_done: Optional[Callable[[Future], None]] = None):
+        """Queue a pipeline run on its lane unless its previous run hasn't finished"""
+        pending = running.get(name)
+        if pending is not None and not pending.done():
+            logger.warning(f"Previous {name} run still in progress, skipping this one")
+            return
+        try:
+            future = executors[lane].submit(job)
+        except RuntimeError:
+            return  # executor shut down by stop_scheduler
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        running[name] = future
+    
+    def arm(name: str, lane: str, job: Callable[[], Any], interval: float,
+            on_done: Optional[Callable[[Future], None]] = None):
+        """Fire job every interval seconds on fixed deadlines (no drift)"""
+        def fire(deadline: float):
+            # After a stall, resume from now rather than replaying missed runs
+            next_deadline = max(deadline + interval, loop.time())
+            timers[name] = loop.call_at(next_deadline, fire, next_deadline)
+            submit(name, lane, job, on_done)
+        start = loop.time() + interval
+        timers[name] = loop.call_at(start, fire, start)
+    
+    # The event loop's timer heap orders the deadlines, so the thread sleeps
+    # until the earliest one with nothing to poll
+    jobs = [
+        ("inference", "inference", _run_inference_pipeline, refresh_interval, None),
+        ("feature", "store", _run_feature_pipeline, refresh_interval, None),
+        ("training", "store", _run_training_pipeline, training_interval, _on_training_done),
+    ]
+    # Start-up runs go to the lanes straight away - training queues behind the
+    # feature run, so it trains on fresh features as before. They also warm the
+    # pipeline imports, and the loop is listening for stop_scheduler meanwhile
+    for name, lane, job, interval, on_done in jobs:
+        submit(name, lane, job, on_done)
+        arm(name, lane, job, interval, on_done)
+    
+    try:
+        await stop.wait()
+    finally:
+        for timer in timers.values():
+            timer.cancel()
+        _release_loop(loop)
+
+
+def _scheduler_main(executors: Dict[str, ThreadPoolExecutor]):
+    """Scheduler thread entry point"""
+    asyncio.run(_scheduler_async(executors))
 
 
 def start_scheduler():
     """Start background scheduler"""
-    global _scheduler_thread, _scheduler_running
+    global _scheduler_thread, _scheduler_running, _store_executor, _inference_executor
     
     if _scheduler_running:
         return
     
     _scheduler_running = True
-    _scheduler_thread = threading.Thread(target=_scheduler_loop, daemon=True)
+    _store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cs-store")
+    _inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cs-infer")
+    executors = {"store": _store_executor, "inference": _inference_executor}
+    _scheduler_thread = threading.Thread(target=_scheduler_main, args=(executors,), daemon=True)
     _scheduler_thread.start()
     logger.info("Background scheduler thread started")
 
@@ -129,6 +236,17 @@ def stop_scheduler():
     """Stop background scheduler"""
     global _scheduler_running
     _scheduler_running = False
+    with _loop_lock:
+        loop, stop = _loop, _stop_async
+    if loop is not None and stop is not None:
+        try:
+            loop.call_soon_threadsafe(stop.set)
+        except RuntimeError:
+            pass  # loop already closed
+    for executor in (_store_executor, _inference_executor):
+        if executor is not None:
+            # Runs in progress finish in the background; queued ones are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
     logger.info("Background scheduler stopped")
 
 
@@ -1,48 +1,64 @@
 """Deploy CryptoSentinel pipelines to Prefect Cloud with reliable scheduling"""
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from prefect.client.schemas.schedules import IntervalSchedule
-from pipelines.feature_pipeline import feature_pipeline
-from pipelines.training_pipeline import training_pipeline
 
-print("Deploying pipelines to Prefect Cloud...")
-print("Creating deployments...\n")
 
-# Create deployments with schedules
-feature_deployment = feature_pipeline.to_deployment(
-    name="feature-pipeline-prod",
-    tags=["production", "crypto", "features"],
-    schedule=IntervalSchedule(interval=timedelta(minutes=5))
-)
+def _build_deployments():
+    """Feature and training deployments with their schedules"""
+    # Importing the flows pulls in pandas/sklearn/xgboost - only pay for it when deploying
+    from prefect.client.schemas.schedules import IntervalSchedule
+    from pipelines.feature_pipeline import feature_pipeline
+    from pipelines.training_pipeline import training_pipeline
+    
+    feature_deployment = feature_pipeline.to_deployment(
+        name="feature-pipeline-prod",
+        tags=["production", "crypto", "features"],
+        schedule=IntervalSchedule(interval=timedelta(minutes=5))
+    )
+    
+    training_deployment = training_pipeline.to_deployment(
+        name="training-pipeline-prod",
+        tags=["production", "crypto", "training"],
+        schedule=IntervalSchedule(interval=timedelta(minutes=30))
+    )
+    
+    return [
+        ("Feature Pipeline", "every 5 min", feature_deployment),
+        ("Training Pipeline", "every 30 min", training_deployment),
+    ]
 
-training_deployment = training_pipeline.to_deployment(
-    name="training-pipeline-prod",
-    tags=["production", "crypto", "training"],
-    schedule=IntervalSchedule(interval=timedelta(minutes=30))
-)
 
-# Apply deployments to Prefect Cloud
-print("Deploying Feature Pipeline (every 5 min)...")
-try:
-    feature_deployment.apply()
-    print("Feature Pipeline deployed!")
-except Exception as e:
-    print(f"Error deploying Feature Pipeline: {e}")
-
-print("\nDeploying Training Pipeline (every 30 min)...")
-try:
-    training_deployment.apply()
-    print("Training Pipeline deployed!")
-except Exception as e:
-    print(f"Error deploying Training Pipeline: {e}")
-
-print("\n" + "="*70)
-print("DEPLOYMENT COMPLETE!")
-print("="*70)
-print("\nNext Steps:")
-print("1. View deployments in Prefect Cloud: https://app.prefect.cloud")
-print("2. Pipelines will run automatically on schedule")
-print("\nSchedules:")
-print("   - Feature Pipeline: Every 5 minutes")
-print("   - Training Pipeline: Every 30 minutes")
+def main():
+    """Create the deployments and apply them to Prefect Cloud"""
+    print("Deploying pipelines to Prefect Cloud...")
+    print("Creating deployments...\n")
+    
+    # The two deployments are independent API calls - apply them side by side
+    deployments = _build_deployments()
+    with ThreadPoolExecutor(max_workers=len(deployments)) as pool:
+        futures = []
+        for label, schedule, deployment in deployments:
+            print(f"Deploying {label} ({schedule})...")
+            futures.append((label, pool.submit(deployment.apply)))
+        
+        for label, future in futures:
+            try:
+                future.result()
+                print(f"{label} deployed!")
+            except Exception as e:
+                print(f"Error deploying {label}: {e}")
+    print()
+    
+    print("="*70)
+    print("DEPLOYMENT COMPLETE!")
+    print("="*70)
+    print("\nNext Steps:")
+    print("1. View deployments in Prefect Cloud: https://app.prefect.cloud")
+    print("2. Pipelines will run automatically on schedule")
+    print("\nSchedules:")
+    print("   - Feature Pipeline: Every 5 minutes")
+    print("   - Training Pipeline: Every 30 minutes")
 
 
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ This creates a single figure with both subplots
 """
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.patches import Patch
 
 # Replace with your actual metrics
 models = ['XGBoost', 'Random Forest', 'Gradient Boosting', 'Ridge']
@@ -21,9 +22,14 @@ width = 0.25
 # Normalize RMSE and MAE for better visualization (or use separate y-axes)
 ax1_twin = ax1.twinx()
 
-bars1 = ax1.bar(x - width, rmse, width, label='RMSE', color='#6366f1', alpha=0.8)
-bars2 = ax1.bar(x, mae, width, label='MAE', color='#a855f7', alpha=0.8)
-bars3 = ax1_twin.bar(x + width, r2, width, label='R²', color='#22c55e', alpha=0.8)
+# RMSE and MAE share an axis - draw both series in one bar call, one row per metric
+error_metrics = np.array([rmse, mae])
+offsets = np.array([-width, 0.0])
+error_colors = ['#6366f1', '#a855f7']
+x_pos = (x[None, :] + offsets[:, None]).ravel()
+bars_err = ax1.bar(x_pos, error_metrics.ravel(), width,
+                   color=np.repeat(error_colors, len(models)), alpha=0.8)
+bars_r2 = ax1_twin.bar(x + width, r2, width, label='R²', color='#22c55e', alpha=0.8)
 
 ax1.set_xlabel('Model', fontsize=11)
 ax1.set_ylabel('RMSE / MAE', fontsize=11, color='#6366f1')
@@ -31,7 +37,8 @@ ax1_twin.set_ylabel('R² Score', fontsize=11, color='#22c55e')
 ax1.set_title('(a) Model Performance Comparison', fontsize=12, fontweight='bold')
 ax1.set_xticks(x)
 ax1.set_xticklabels(models, rotation=45, ha='right')
-ax1.legend(loc='upper left')
+ax1.legend(handles=[Patch(color=c, alpha=0.8, label=l) for c, l in zip(error_colors, ['RMSE', 'MAE'])],
+           loc='upper left')
 ax1_twin.legend(loc='upper right')
 ax1.grid(True, alpha=0.3)
 
@@ -41,11 +48,14 @@ feature_names = ['RSI', 'MACD Histogram', 'BB Position', 'SMA Ratio', 'Volatilit
                  'Momentum', 'ROC', 'Price Lag 1', 'Returns Lag 1', 'Hour']
 shap_values = [0.15, 0.12, 0.10, 0.08, 0.07, 0.06, 0.05, 0.04, 0.03, 0.02]  # Replace with actual
 
-# Sort by absolute value
-sorted_data = sorted(zip(feature_names, shap_values), key=lambda x: abs(x[1]), reverse=True)
-top_features, top_values = zip(*sorted_data[:10])
+# Sort by absolute value (stable, so ties keep their listed order)
+vals = np.asarray(shap_values)
+names = np.asarray(feature_names)
+order = np.argsort(-np.abs(vals), kind='stable')[:10]
+top_values = vals[order]
+top_features = names[order]
 
-colors = ['#22c55e' if v > 0 else '#ef4444' for v in top_values]
+colors = np.where(top_values > 0, '#22c55e', '#ef4444')
 ax2.barh(range(len(top_features)), top_values, color=colors, alpha=0.8)
 ax2.set_yticks(range(len(top_features)))
 ax2.set_yticklabels(top_features)
@@ -3,6 +3,94 @@ import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
+from operator import itemgetter
+from typing import Optional
+
+_SEVERITY_COLORS = {'high': '#ef4444'}
+_DEFAULT_SEVERITY_COLOR = '#f59e0b'
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_summary():
+    """Alert summary, shared across reruns for 30 seconds"""
+    from app.alerts import get_alert_summary
+    return get_alert_summary()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_history(limit: int, type_filter: Optional[str] = None,
+                    severity_filter: Optional[str] = None):
+    """Recent matching alerts, shared across reruns for 30 seconds"""
+    from app.alerts import get_alert_history
+    return get_alert_history(limit=limit, type_filter=type_filter,
+                             severity_filter=severity_filter)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _type_bar(items: tuple) -> go.Figure:
+    """Alerts-by-type bar chart, built once per distinct set of counts"""
+    fig = go.Figure(go.Bar(
+        x=[name for name, _ in items],
+        y=[count for _, count in items],
+        marker_color=['#a855f7', '#6366f1', '#22c55e', '#ef4444'][:len(items)]
+    ))
+    
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#e2e8f0'),
+        xaxis_title=None,
+        yaxis_title="Count",
+        height=300,
+        margin=dict(l=0, r=0, t=20, b=0)
+    )
+    return fig
+
+
+def _render_alert_details(alert: dict):
+    """Message, severity and type-specific metrics for one alert"""
+    severity = alert.get('severity', 'medium')
+    severity_color = _SEVERITY_COLORS.get(severity, _DEFAULT_SEVERITY_COLOR)
+    
+    st.markdown(f"""
+        <div style="border-left: 4px solid {severity_color}; padding-left: 1rem;">
+            <p><strong>Message:</strong> {alert.get('message', 'N/A')}</p>
+            <p><strong>Severity:</strong> <span style="color: {severity_color}; text-transform: uppercase;">{severity}</span></p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    # Show additional details based on type
+    alert_type_raw = alert.get('type', '')
+    
+    if alert_type_raw == 'price_change':
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
+        with col2:
+            st.metric("Previous", f"${alert.get('previous_price', 0):,.2f}")
+        with col3:
+            st.metric("Change", f"{alert.get('change_percent', 0):+.2f}%")
+    
+    elif alert_type_raw == 'high_volatility':
+        st.metric("Volatility", f"{alert.get('volatility', 0)*100:.2f}%")
+    
+    elif alert_type_raw == 'prediction_deviation':
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
+        with col2:
+            st.metric("Predicted", f"${alert.get('predicted_price', 0):,.2f}")
+        with col3:
+            st.metric("Deviation", f"{alert.get('deviation_percent', 0):.2f}%")
+    
+    elif alert_type_raw == 'drawdown':
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
+        with col2:
+            st.metric("Peak", f"${alert.get('peak_price', 0):,.2f}")
+        with col3:
+            st.metric("Drawdown", f"{alert.get('drawdown_percent', 0):.2f}%")
 
 
 def render():
@@ -33,10 +121,8 @@ def render():
         """)
     
     try:
-        from app.alerts import get_alert_history, get_alert_summary
-        
         # Summary metrics
-        summary = get_alert_summary()
+        summary = _cached_summary()
         
         col1, col2, col3 = st.columns(3)
         
@@ -46,7 +132,7 @@ def render():
             st.metric("High Severity", summary.get('high_severity', 0))
         with col3:
             by_type = summary.get('by_type', {})
-            most_common = max(by_type.items(), key=lambda x: x[1])[0] if by_type else "None"
+            most_common = max(by_type.items(), key=itemgetter(1))[0] if by_type else "None"
             st.metric("Most Common", most_common.replace('_', ' ').title())
         
         # Alerts by type chart
@@ -54,25 +140,7 @@ def render():
             st.markdown("---")
             st.subheader("Alerts by Type")
             
-            by_type = summary['by_type']
-            
-            fig = go.Figure(go.Bar(
-                x=list(by_type.keys()),
-                y=list(by_type.values()),
-                marker_color=['#a855f7', '#6366f1', '#22c55e', '#ef4444'][:len(by_type)]
-            ))
-            
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#e2e8f0'),
-                xaxis_title=None,
-                yaxis_title="Count",
-                height=300,
-                margin=dict(l=0, r=0, t=20, b=0)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_type_bar(tuple(summary['by_type'].items())), use_container_width=True, key="alerts_bar")
         
         # Alert history
         st.markdown("---")
@@ -93,60 +161,34 @@ def render():
                 index=0
             )
         
-        alerts = get_alert_history(limit=50)
-        
-        # Apply filters
-        if filter_type != "All":
-            alerts = [a for a in alerts if a.get('type') == filter_type]
-        if filter_severity != "All":
-            alerts = [a for a in alerts if a.get('severity') == filter_severity]
+        alerts = _cached_history(
+            50,
+            filter_type if filter_type != "All" else None,
+            filter_severity if filter_severity != "All" else None
+        )
         
         if alerts:
-            for alert in reversed(alerts):
-                severity = alert.get('severity', 'medium')
-                severity_color = '#ef4444' if severity == 'high' else '#f59e0b'
-                alert_type = alert.get('type', 'unknown').replace('_', ' ').title()
-                
-                with st.expander(f"{alert_type} - {alert.get('timestamp', '')[:19]}", expanded=False):
-                    st.markdown(f"""
-                        <div style="border-left: 4px solid {severity_color}; padding-left: 1rem;">
-                            <p><strong>Message:</strong> {alert.get('message', 'N/A')}</p>
-                            <p><strong>Severity:</strong> <span style="color: {severity_color}; text-transform: uppercase;">{severity}</span></p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Show additional details based on type
-                    alert_type_raw = alert.get('type', '')
-                    
-                    if alert_type_raw == 'price_change':
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
-                        with col2:
-                            st.metric("Previous", f"${alert.get('previous_price', 0):,.2f}")
-                        with col3:
-                            st.metric("Change", f"{alert.get('change_percent', 0):+.2f}%")
-                    
-                    elif alert_type_raw == 'high_volatility':
-                        st.metric("Volatility", f"{alert.get('volatility', 0)*100:.2f}%")
-                    
-                    elif alert_type_raw == 'prediction_deviation':
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
-                        with col2:
-                            st.metric("Predicted", f"${alert.get('predicted_price', 0):,.2f}")
-                        with col3:
-                            st.metric("Deviation", f"{alert.get('deviation_percent', 0):.2f}%")
-                    
-                    elif alert_type_raw == 'drawdown':
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Current", f"${alert.get('current_price', 0):,.2f}")
-                        with col2:
-                            st.metric("Peak", f"${alert.get('peak_price', 0):,.2f}")
-                        with col3:
-                            st.metric("Drawdown", f"{alert.get('drawdown_percent', 0):.2f}%")
+            # One table for the list, full details only for the alert picked below
+            newest_first = alerts[::-1]
+            df = (
+                pd.DataFrame(newest_first)
+                .reindex(columns=["timestamp", "type", "severity", "message"])
+                .fillna({"timestamp": "", "type": "unknown", "severity": "medium", "message": "N/A"})
+            )
+            table = pd.DataFrame({
+                "Time": df["timestamp"].astype(str).str.slice(0, 19),
+                "Type": df["type"].str.replace("_", " ").str.title(),
+                "Severity": df["severity"].str.upper(),
+                "Message": df["message"],
+            })
+            st.dataframe(table, use_container_width=True, hide_index=True)
+            
+            selected = st.selectbox(
+                "Inspect alert",
+                table.index,
+                format_func=lambda i: f"{table.at[i, 'Type']} - {table.at[i, 'Time']}"
+            )
+            _render_alert_details(newest_first[selected])
         else:
             st.info("No alerts match the current filters.")
         
@@ -157,6 +199,8 @@ def render():
             if st.button("Clear All Alerts"):
                 from app.alerts import clear_alerts
                 clear_alerts()
+                _cached_summary.clear()
+                _cached_history.clear()
                 st.success("Alerts cleared!")
                 st.rerun()
         
@@ -2,21 +2,31 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
+import numpy as np
 import pandas as pd
 
+from pages.shared import display_features
+
+_TREND_CLASSES = {'bullish': 'positive', 'bearish': 'negative'}
+
 
 def render():
     """Render data analysis page"""
     st.markdown('<h1 class="main-header">Data Analysis</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Exploratory data analysis and data quality monitoring</p>', unsafe_allow_html=True)
     
-    # Tabs
-    tab1, tab2 = st.tabs(["EDA Report", "Correlations"])
+    # st.tabs would run both sections on every rerun - only render the selected one
+    view = st.radio(
+        "View",
+        ["EDA Report", "Correlations"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="data_analysis_view"
+    )
     
-    with tab1:
+    if view == "EDA Report":
         render_eda()
-    
-    with tab2:
+    else:
         render_correlations()
 
 
@@ -34,8 +44,6 @@ def render_eda():
         """)
     
     try:
-        from app.data_fetcher import fetch_price_history
-        from app.feature_engineering import engineer_features
         from app.eda import generate_eda_report
         
         # Time range selector
@@ -47,8 +55,7 @@ def render_eda():
         )
         
         with st.spinner("Generating EDA report..."):
-            history = fetch_price_history(hours=hours)
-            features = engineer_features(history)
+            features, _ = display_features(hours)
             report = generate_eda_report(features)
         
         if report.get('error'):
@@ -61,7 +68,7 @@ def render_eda():
         with col1:
             trend = report.get('trend', {})
             trend_type = trend.get('trend', 'neutral')
-            trend_color = 'positive' if trend_type == 'bullish' else ('negative' if trend_type == 'bearish' else 'neutral')
+            trend_color = _TREND_CLASSES.get(trend_type, 'neutral')
             
             st.markdown(f"""
                 <div class="metric-card">
@@ -89,7 +96,7 @@ def render_eda():
         st.markdown("---")
         st.subheader("Detailed Statistics")
         
-        stats_df = pd.DataFrame([
+        rows = [
             {"Metric": "Count", "Value": stats.get('count', 0)},
             {"Metric": "Mean", "Value": f"${stats.get('mean', 0):,.2f}"},
             {"Metric": "Median", "Value": f"${stats.get('median', 0):,.2f}"},
@@ -98,13 +105,11 @@ def render_eda():
             {"Metric": "Max", "Value": f"${stats.get('max', 0):,.2f}"},
             {"Metric": "Skewness", "Value": f"{stats.get('skewness', 0):.4f}"},
             {"Metric": "Kurtosis", "Value": f"{stats.get('kurtosis', 0):.4f}"},
-        ])
-        
+        ]
         if stats.get('sharpe_ratio'):
-            stats_df = pd.concat([stats_df, pd.DataFrame([
-                {"Metric": "Sharpe Ratio", "Value": f"{stats.get('sharpe_ratio', 0):.4f}"}
-            ])], ignore_index=True)
+            rows.append({"Metric": "Sharpe Ratio", "Value": f"{stats['sharpe_ratio']:.4f}"})
         
+        stats_df = pd.DataFrame(rows)
         st.dataframe(stats_df, use_container_width=True, hide_index=True)
         
         # Anomalies
@@ -139,13 +144,10 @@ def render_correlations():
         """)
     
     try:
-        from app.data_fetcher import fetch_price_history
-        from app.feature_engineering import engineer_features
         from app.eda import calculate_correlation_matrix
         
         with st.spinner("Calculating correlations..."):
-            history = fetch_price_history(hours=24)
-            features = engineer_features(history)
+            features, _ = display_features(24)
         
         # Feature selection
         available_features = ['price', 'rsi', 'macd', 'volatility', 'momentum_10', 
@@ -162,14 +164,16 @@ def render_correlations():
             corr_data = calculate_correlation_matrix(features, selected_features)
             
             if 'error' not in corr_data:
-                matrix = pd.DataFrame(corr_data['matrix'])
+                # Only the n x n matrix goes to Plotly, never the underlying rows
+                names = corr_data['features']
+                matrix = np.array([[corr_data['matrix'][col][row] for col in names] for row in names])
                 
                 # Heatmap
                 fig = px.imshow(
                     matrix,
                     labels=dict(x="Feature", y="Feature", color="Correlation"),
-                    x=selected_features,
-                    y=selected_features,
+                    x=names,
+                    y=names,
                     color_continuous_scale='RdBu_r',
                     zmin=-1, zmax=1
                 )
@@ -1,9 +1,81 @@
 """Data Drift Detection Page"""
 import streamlit as st
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from pages.shared import recent_features
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _gauge(score: float, threshold: float, drifted: bool) -> go.Figure:
+    """Drift score gauge, built once per distinct reading"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=score,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Drift Score", 'font': {'color': '#e2e8f0'}},
+        delta={'reference': threshold},
+        gauge={
+            'axis': {'range': [None, 1], 'tickcolor': "#e2e8f0"},
+            'bar': {'color': "#ef4444" if drifted else "#22c55e"},
+            'bgcolor': "rgba(0,0,0,0)",
+            'borderwidth': 2,
+            'bordercolor': "#334155",
+            'steps': [
+                {'range': [0, threshold], 'color': 'rgba(34, 197, 94, 0.2)'},
+                {'range': [threshold, 1], 'color': 'rgba(239, 68, 68, 0.2)'}
+            ],
+            'threshold': {
+                'line': {'color': "#f59e0b", 'width': 4},
+                'thickness': 0.75,
+                'value': threshold
+            }
+        }
+    ))
+    
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#e2e8f0'),
+        height=300
+    )
+    return fig
+
+
+def _drift_frame(feature_drifts: dict) -> pd.DataFrame:
+    """Per-feature drift results as columns (statistic, p_value, drifted), indexed by feature"""
+    raw = pd.DataFrame.from_dict(
+        {k: v for k, v in feature_drifts.items() if isinstance(v, dict)}, orient='index'
+    )
+    if raw.empty:
+        return raw
+    raw = raw.reindex(columns=['statistic', 'p_value', 'drifted'])
+    return pd.DataFrame({
+        'statistic': raw['statistic'].fillna(0).astype(float),
+        'p_value': raw['p_value'].fillna(1).astype(float),
+        'drifted': raw['drifted'].fillna(False).astype(bool)
+    }, index=raw.index)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _drift_summary(report_timestamp: str, _feature_drifts: dict):
+    """Top-15 display table plus drifted/total counts, rebuilt only when the report timestamp changes"""
+    raw = _drift_frame(_feature_drifts)
+    if raw.empty:
+        return None
+    
+    # Show top 15 drifting features
+    top = raw.nlargest(15, 'statistic')
+    df_drift = pd.DataFrame({
+        "Feature": top.index,
+        "Statistic": top['statistic'].map("{:.4f}".format),
+        "P-Value": top['p_value'].map("{:.4f}".format),
+        "Drifted": np.where(top['drifted'], "✓", "✗")
+    })
+    return df_drift, int(raw['drifted'].sum()), len(raw)
+
 
 def render():
     """Render data drift detection page"""
@@ -63,81 +135,30 @@ def render():
         timestamp = report.get('timestamp', 'N/A')
         method = report.get('method', 'unknown')
         
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            status_emoji = "🔴" if drift_detected else "🟢"
-            status_text = "DRIFT DETECTED" if drift_detected else "NO DRIFT"
-            st.markdown(f"""
-                <div class="metric-card">
-                    <p style="color: #94a3b8;">Status</p>
-                    <p style="font-size: 1.5rem;">{status_emoji} {status_text}</p>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            score_color = "negative" if drift_detected else "positive"
-            st.markdown(f"""
-                <div class="metric-card">
-                    <p style="color: #94a3b8;">Drift Score</p>
-                    <p class="{score_color}" style="font-size: 1.5rem;">{drift_score:.4f}</p>
-                    <p style="color: #64748b; font-size: 0.85rem;">Threshold: {threshold}</p>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-                <div class="metric-card">
-                    <p style="color: #94a3b8;">Method</p>
-                    <p style="font-size: 1.2rem; color: #a855f7;">{method.upper()}</p>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown(f"""
-                <div class="metric-card">
-                    <p style="color: #94a3b8;">Last Check</p>
-                    <p style="font-size: 1rem;">{timestamp[:19] if timestamp != 'N/A' else 'N/A'}</p>
-                </div>
-            """, unsafe_allow_html=True)
+        # All four cards in one element instead of one markdown call per column
+        status_emoji = "🔴" if drift_detected else "🟢"
+        status_text = "DRIFT DETECTED" if drift_detected else "NO DRIFT"
+        score_color = "negative" if drift_detected else "positive"
+        last_check = timestamp[:19] if timestamp != 'N/A' else 'N/A'
+        cards = [
+            f'<div class="metric-card"><p style="color: #94a3b8;">Status</p>'
+            f'<p style="font-size: 1.5rem;">{status_emoji} {status_text}</p></div>',
+            f'<div class="metric-card"><p style="color: #94a3b8;">Drift Score</p>'
+            f'<p class="{score_color}" style="font-size: 1.5rem;">{drift_score:.4f}</p>'
+            f'<p style="color: #64748b; font-size: 0.85rem;">Threshold: {threshold}</p></div>',
+            f'<div class="metric-card"><p style="color: #94a3b8;">Method</p>'
+            f'<p style="font-size: 1.2rem; color: #a855f7;">{method.upper()}</p></div>',
+            f'<div class="metric-card"><p style="color: #94a3b8;">Last Check</p>'
+            f'<p style="font-size: 1rem;">{last_check}</p></div>',
+        ]
+        st.markdown(f'<div class="metric-row">{"".join(cards)}</div>', unsafe_allow_html=True)
         
         # Visualization
         st.markdown("---")
         st.subheader("Drift Score Visualization")
         
         # Gauge chart
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=drift_score,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Drift Score", 'font': {'color': '#e2e8f0'}},
-            delta={'reference': threshold},
-            gauge={
-                'axis': {'range': [None, 1], 'tickcolor': "#e2e8f0"},
-                'bar': {'color': "#ef4444" if drift_detected else "#22c55e"},
-                'bgcolor': "rgba(0,0,0,0)",
-                'borderwidth': 2,
-                'bordercolor': "#334155",
-                'steps': [
-                    {'range': [0, threshold], 'color': 'rgba(34, 197, 94, 0.2)'},
-                    {'range': [threshold, 1], 'color': 'rgba(239, 68, 68, 0.2)'}
-                ],
-                'threshold': {
-                    'line': {'color': "#f59e0b", 'width': 4},
-                    'thickness': 0.75,
-                    'value': threshold
-                }
-            }
-        ))
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#e2e8f0'),
-            height=300
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_gauge(drift_score, threshold, drift_detected), use_container_width=True, key="drift_gauge")
         
         # Feature-level drift
         st.markdown("---")
@@ -146,27 +167,13 @@ def render():
         feature_drifts = report.get('feature_drifts', {})
         
         if feature_drifts:
-            # Show top drifting features
-            drift_items = []
-            for feature, data in feature_drifts.items():
-                if isinstance(data, dict):
-                    drift_items.append({
-                        "Feature": feature,
-                        "Statistic": f"{data.get('statistic', 0):.4f}",
-                        "P-Value": f"{data.get('p_value', 1):.4f}",
-                        "Drifted": "✓" if data.get('drifted', False) else "✗"
-                    })
+            summary = _drift_summary(timestamp, feature_drifts)
             
-            if drift_items:
-                df_drift = pd.DataFrame(drift_items)
-                df_drift = df_drift.sort_values('Statistic', ascending=False)
-                
-                # Show top 15
-                st.dataframe(df_drift.head(15), use_container_width=True, hide_index=True)
+            if summary is not None:
+                df_drift, drifted_count, total_count = summary
+                st.dataframe(df_drift, use_container_width=True, hide_index=True)
                 
                 # Count drifted features
-                drifted_count = sum(1 for item in drift_items if item["Drifted"] == "✓")
-                total_count = len(drift_items)
                 drift_pct = (drifted_count / total_count * 100) if total_count > 0 else 0
                 
                 col1, col2, col3 = st.columns(3)
@@ -239,15 +246,10 @@ def render():
             if st.button("Check Drift Only", type="secondary"):
                 try:
                     with st.spinner("Checking for drift..."):
-                        from app.data_fetcher import fetch_price_history
-                        from app.feature_engineering import engineer_features, get_feature_names
                         from app.drift_detection import detect_drift
                         
-                        history = fetch_price_history(hours=24)
-                        features_df = engineer_features(history)
-                        feature_cols = get_feature_names()
-                        available_cols = [c for c in feature_cols if c in features_df.columns]
-                        drift_result = detect_drift(features_df, available_cols)
+                        features_df, feature_cols = recent_features(24)
+                        drift_result = detect_drift(features_df, feature_cols)
                     
                     st.markdown("---")
                     st.markdown("### Drift Check Results")
@@ -274,16 +276,10 @@ def render():
                     feature_drifts = drift_result.get('feature_drifts', {})
                     if feature_drifts:
                         with st.expander("Feature-Level Details"):
-                            drift_items = []
-                            for feature, data in feature_drifts.items():
-                                if isinstance(data, dict):
-                                    drift_items.append({
-                                        "Feature": feature,
-                                        "Drifted": "✓" if data.get('drifted', False) else "✗"
-                                    })
-                            if drift_items:
-                                drifted_count = sum(1 for item in drift_items if item["Drifted"] == "✓")
-                                st.markdown(f"**{drifted_count} of {len(drift_items)} features showing drift**")
+                            raw = _drift_frame(feature_drifts)
+                            if not raw.empty:
+                                drifted_count = int(raw['drifted'].sum())
+                                st.markdown(f"**{drifted_count} of {len(raw)} features showing drift**")
                     
                 except Exception as e:
                     st.error(f"Drift check failed: {e}")
@@ -3,6 +3,7 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import time
 
@@ -132,20 +133,21 @@ def render():
         
         fig = go.Figure()
         
-        # Add green/red fill based on price movement
-        df['price_change'] = df['price'].diff()
-        df['color'] = df['price_change'].apply(lambda x: '#22c55e' if x >= 0 else '#ef4444')
-        
-        # Main price line with gradient colors
-        for i in range(len(df) - 1):
+        # Main price line coloured by direction: one trace per colour, segments split by NaN gaps
+        x = df['datetime'].to_numpy()
+        y = df['price'].to_numpy(dtype=float)
+        rising = np.diff(y) >= 0
+        for color, mask in (('#22c55e', rising), ('#ef4444', ~rising)):
+            starts = np.flatnonzero(mask)
             fig.add_trace(go.Scatter(
-                x=df['datetime'].iloc[i:i+2],
-                y=df['price'].iloc[i:i+2],
+                x=np.column_stack([x[starts], x[starts + 1], x[starts + 1]]).ravel(),
+                y=np.column_stack([y[starts], y[starts + 1], np.full(len(starts), np.nan)]).ravel(),
                 mode='lines',
-                name='BTC Price' if i == 0 else '',
-                showlegend=(i == 0),
+                name='BTC Price',
+                legendgroup='price',
+                showlegend=bool(len(mask)) and bool(mask[0]),
                 line=dict(
-                    color=df['color'].iloc[i+1],
+                    color=color,
                     width=3
                 ),
                 hoverinfo='skip'
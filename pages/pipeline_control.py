@@ -197,7 +197,8 @@ def render():
     st.subheader("Configuration")
     
     try:
-        from app.config import settings
+        from app.config import load_hopsworks_settings
+        settings = load_hopsworks_settings()
         
         config_df = pd.DataFrame([
             {"Setting": "Prediction Refresh", "Value": f"{settings.PREDICTION_REFRESH_MINUTES} min"},
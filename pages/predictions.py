@@ -65,7 +65,7 @@ def render():
         current = fetch_current_price()
         history = fetch_price_history(hours=6)
         features = engineer_features(history)
-        prediction = generate_prediction(features, current['current_price'])
+        prediction = generate_prediction(features, current['current_price'], all_models=True)
         
         if prediction:
             col1, col2, col3 = st.columns(3)
@@ -0,0 +1,38 @@
+"""Cached data helpers shared by the dashboard pages"""
+import streamlit as st
+
+# Dollar-valued columns keep float64 - float32 cannot hold BTC prices to the cent
+_PRICE_SCALE_PREFIXES = ('price', 'future_price', 'bb_upper', 'bb_middle', 'bb_lower', 'sma_', 'ema_')
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def price_history(hours: int = 24):
+    """Price history, shared across pages and reruns for a minute"""
+    from app.data_fetcher import fetch_price_history
+    return fetch_price_history(hours=hours)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def recent_features(hours: int = 24):
+    """Engineered features for the last `hours` and the model feature columns present in them.
+
+    Full float64 precision - the drift check compares this frame against the
+    float64 training reference.
+    """
+    from app.feature_engineering import engineer_features, get_feature_names
+    features_df = engineer_features(price_history(hours))
+    feature_cols = [c for c in get_feature_names() if c in features_df.columns]
+    return features_df, feature_cols
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def display_features(hours: int = 24):
+    """recent_features for the EDA and correlation views, indicators narrowed to float32.
+
+    Built from the cached recent_features, so features are still engineered once;
+    the smaller frame is what gets copied out on every rerun of those views.
+    """
+    features_df, feature_cols = recent_features(hours)
+    narrow = {c: 'float32' for c in features_df.select_dtypes('float64').columns
+              if not c.startswith(_PRICE_SCALE_PREFIXES) or c.startswith('price_to_')}
+    return features_df.astype(narrow), feature_cols
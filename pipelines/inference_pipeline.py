@@ -5,7 +5,7 @@ from prefect import flow, task
 
 from app.data_fetcher import fetch_current_price, fetch_price_history
 from app.feature_engineering import engineer_features
-from app.predictor import generate_prediction, validate_predictions
+from app.predictor import generate_prediction, validate_predictions, flush_predictions_to_hopsworks
 from app.alerts import check_alerts
 
 logging.basicConfig(level=logging.INFO)
@@ -66,6 +66,7 @@ def inference_pipeline():
     prediction = run_prediction(features, current_price)
     validate_past_predictions(current_price)
     alerts = check_for_alerts(current, prediction, features)
+    flush_predictions_to_hopsworks()
     duration = (datetime.now() - start_time).total_seconds()
     logger.info(f"Inference complete ({duration:.2f}s)")
     return {
@@ -2,7 +2,7 @@ import logging
 from datetime import datetime
 from prefect import flow, task
 from app.config import settings
-from app.feature_engineering import get_feature_names
+from app.feature_engineering import get_feature_names, clear_feature_cache
 from app.model_trainer import (
     train_regression_models, train_classifier, train_kmeans,
     select_best_model, save_models, promote_to_active
@@ -116,6 +116,7 @@ def training_pipeline():
     result = save_and_register_models(models, scaler, metrics, best_name)
     clear_old_predictions_task()
     set_drift_baseline_task(features_df, feature_cols)
+    clear_feature_cache()
     duration = (datetime.now() - start_time).total_seconds()
     logger.info(f"Training complete ({duration:.2f}s)")
     return {
@@ -5,7 +5,7 @@ from typing import Optional, Dict, Any
 
 import pandas as pd
 
-from app.config import settings
+from app.config import settings, load_hopsworks_settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,8 @@ def _connect():
     try:
         import hopsworks
         
+        load_hopsworks_settings()
+        
         # Project-specific API keys don't need project parameter
         _connection = hopsworks.login(
             api_key_value=settings.HOPSWORKS_API_KEY
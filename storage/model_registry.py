@@ -1,13 +1,14 @@
 """Hopsworks Model Registry Integration"""
 import logging
 import tempfile
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 import joblib
 
-from app.config import settings
+from app.config import settings, load_hopsworks_settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,11 @@ logger = logging.getLogger(__name__)
 _connection = None
 _model_registry = None
 
+# Downloaded bundles by (model name, version), most recent last - small so a
+# rollback to a recent version doesn't re-download
+_BUNDLE_CACHE_SIZE = 4
+_bundle_cache: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+
 
 def _connect():
     """Connect to Hopsworks Model Registry"""
@@ -26,6 +32,8 @@ def _connect():
     try:
         import hopsworks
         
+        load_hopsworks_settings()
+        
         # Project-specific API keys don't need project parameter
         _connection = hopsworks.login(
             api_key_value=settings.HOPSWORKS_API_KEY
@@ -120,6 +128,20 @@ def register_model_bundle(models: Dict[str, Any],
         return None
 
 
+def get_latest_model_version(model_name: str = "crypto_model_bundle") -> Optional[int]:
+    """Version number of the latest model, without downloading it"""
+    mr = _connect()
+    
+    if mr is None:
+        return None
+    
+    try:
+        return mr.get_model(model_name, version=None).version
+    except Exception as e:
+        logger.error(f"Model version lookup error: {e}")
+        return None
+
+
 def get_latest_model(model_name: str = "crypto_model_bundle"
                     ) -> Optional[Dict[str, Any]]:
     """Get latest model from registry"""
@@ -132,6 +154,14 @@ def get_latest_model(model_name: str = "crypto_model_bundle"
         # Get latest version
         model = mr.get_model(model_name, version=None)
         
+        # Versions are immutable - a bundle already downloaded can be reused
+        key = (model_name, model.version)
+        cached = _bundle_cache.get(key)
+        if cached is not None:
+            _bundle_cache.move_to_end(key)
+            logger.info(f"Using cached model {model_name} v{model.version}")
+            return cached
+        
         with tempfile.TemporaryDirectory() as tmp_dir:
             model_dir = model.download(tmp_dir)
             model_path = Path(model_dir)
@@ -146,6 +176,11 @@ def get_latest_model(model_name: str = "crypto_model_bundle"
                 else:
                     result["models"][file.stem] = joblib.load(file)
             
+            result["version"] = model.version
+            _bundle_cache[key] = result
+            while len(_bundle_cache) > _BUNDLE_CACHE_SIZE:
+                _bundle_cache.popitem(last=False)
+            
             logger.info(f"Loaded model {model_name} v{model.version}")
             return result
             
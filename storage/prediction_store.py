@@ -1,23 +1,30 @@
 """Prediction storage in Hopsworks Feature Store"""
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import pandas as pd
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Feature group handle and the timestamps already stored in it, reused across
+# syncs so each one is a single insert on the cached connection
+_prediction_fg = None
+_synced_timestamps: Optional[Set[str]] = None
+
 
 def get_prediction_feature_group():
     """Get or create prediction history feature group"""
+    global _prediction_fg
+    if _prediction_fg is not None:
+        return _prediction_fg
+    
     try:
         from storage.feature_store import _connect
         
-        project = _connect()
-        if project is None:
+        fs = _connect()
+        if fs is None:
             return None
         
-        fs = project.get_feature_store()
-        
         try:
             fg = fs.get_feature_group("prediction_history", version=1)
             logger.info("Retrieved existing prediction_history feature group")
@@ -31,6 +38,7 @@ def get_prediction_feature_group():
                 online_enabled=True
             )
         
+        _prediction_fg = fg
         return fg
         
     except Exception as e:
@@ -40,6 +48,7 @@ def get_prediction_feature_group():
 
 def store_predictions_to_hopsworks(predictions: List[Dict[str, Any]]):
     """Store predictions in Hopsworks Feature Store"""
+    global _synced_timestamps
     try:
         if not predictions:
             return False
@@ -68,16 +77,18 @@ def store_predictions_to_hopsworks(predictions: List[Dict[str, Any]]):
         available_cols = [c for c in required_cols + optional_cols if c in df.columns]
         df = df[available_cols]
         
-        existing_data = fg.read()
-        if not existing_data.empty:
-            existing_timestamps = set(existing_data['timestamp'].values)
-            df = df[~df['timestamp'].isin(existing_timestamps)]
+        # Read the stored timestamps once, then track our own inserts
+        if _synced_timestamps is None:
+            existing_data = fg.read()
+            _synced_timestamps = set() if existing_data.empty else set(existing_data['timestamp'].values)
+        df = df[~df['timestamp'].isin(_synced_timestamps)]
         
         if df.empty:
             logger.info("No new predictions to store")
             return True
         
         fg.insert(df, write_options={"wait_for_job": False})
+        _synced_timestamps.update(df['timestamp'].values)
         logger.info(f"Stored {len(df)} predictions to Hopsworks")
         return True
         
@@ -116,13 +127,15 @@ def fetch_predictions_from_hopsworks(limit: int = 50, hours: int = 2) -> List[Di
 
 def clear_prediction_history():
     """Clear all predictions from Hopsworks and local storage"""
+    global _prediction_fg, _synced_timestamps
     try:
         # Clear Hopsworks feature group by deleting and recreating
         from storage.feature_store import _connect
         
-        project = _connect()
-        if project:
-            fs = project.get_feature_store()
+        _prediction_fg = None
+        _synced_timestamps = None
+        fs = _connect()
+        if fs:
             try:
                 fg = fs.get_feature_group("prediction_history", version=1)
                 fg.delete()
@@ -133,9 +146,11 @@ def clear_prediction_history():
         # Clear local file
         from app.config import settings
         predictions_file = Path(settings.BASE_DIR) / "data" / "predictions_history.json"
-        if predictions_file.exists():
-            predictions_file.unlink()
-            logger.info("Deleted local predictions file")
+        for path in (predictions_file, predictions_file.with_suffix(".ndjson"),
+                     predictions_file.with_suffix(".pkl")):
+            if path.exists():
+                path.unlink()
+                logger.info(f"Deleted local predictions file {path.name}")
         
         logger.info("Prediction history cleared successfully")
         return True